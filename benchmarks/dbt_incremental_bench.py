@@ -0,0 +1,141 @@
+"""Full rebuild vs incremental run of stg_nyc_modern on synthetic Citi Bike data.
+
+Loads ``--history-months`` synthetic months into a scratch copy of
+raw_nyc_modern, builds stg_nyc_modern from scratch, loads one more month and
+then times:
+
+* ``incremental``: ``dbt run`` picking up only the new month's load batch
+* ``full_refresh``: ``dbt run --full-refresh`` rebuilding every month
+
+    python -m benchmarks.dbt_incremental_bench --dsn "dbname=citycycles" --target bench \\
+        --rows-per-month 1e6 --history-months 6 --out bench/stg_nyc_modern.json
+
+Raw rows go to the ``--raw-schema`` schema (never ``public``), which the
+models read through the ``raw_schema`` dbt var. ``--target`` must name a
+profiles.yml target in the same database with its own schema, so the models
+are built next to, not over, the real ones.
+"""
+import os
+import json
+import time
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timezone
+from data_models.base import normalize_header
+from data_models.csv_reader import read_csv_chunks
+from data_models.nyc_bike import NYCModernBikeShareRecord
+from benchmarks.synthetic import write_synthetic_csv
+from benchmarks.loader_bench import _git_commit
+
+MODEL = NYCModernBikeShareRecord
+DBT_MODEL = "stg_nyc_modern"
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dbt_city_cycles")
+
+
+def _months(first_year, first_month, count):
+    for i in range(count):
+        index = first_year * 12 + first_month - 1 + i
+        yield index // 12, index % 12 + 1
+
+
+def prepare_raw(conn, raw_schema):
+    """Create an empty scratch copy of the raw table in ``raw_schema``."""
+    if raw_schema == "public":
+        raise ValueError("Refusing to benchmark against the public schema; pass a scratch --raw-schema")
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA IF NOT EXISTS {raw_schema}")
+        cur.execute(f"DROP TABLE IF EXISTS {raw_schema}.{MODEL.staging_table}")
+        cur.execute(f"SET search_path TO {raw_schema}")
+        cur.execute(MODEL.get_schema_sql())
+    conn.commit()
+
+
+def load_month(conn, path):
+    """COPY one synthetic file into the scratch raw table as a single load batch."""
+    source_file = os.path.basename(path)
+    rows = 0
+    with open(path, "rb") as stream:
+        for chunk in read_csv_chunks(stream, chunksize=200_000, dtypes=MODEL.get_csv_dtypes()):
+            chunk.columns = normalize_header(chunk.columns)
+            df = MODEL.to_dataframe(chunk, source_file)
+            MODEL.to_database(df, conn=conn)
+            rows += len(df)
+    conn.commit()
+    return rows
+
+
+def dbt_run(target, raw_schema, full_refresh=False):
+    """Run dbt on the model and return wall seconds."""
+    command = ["dbt", "run", "--select", DBT_MODEL, "--target", target, "--project-dir", PROJECT_DIR,
+               "--vars", json.dumps({"raw_schema": raw_schema})]
+    if full_refresh:
+        command.append("--full-refresh")
+    start = time.perf_counter()
+    subprocess.run(command, check=True)
+    return time.perf_counter() - start
+
+
+def run(args):
+    import psycopg2
+    rows_per_month = int(args.rows_per_month)
+    months = list(_months(args.first_year, args.first_month, args.history_months + 1))
+    paths = []
+    for i, (year, month) in enumerate(months):
+        path = os.path.join(args.data_dir, f"synthetic_{year:04d}{month:02d}-citibike-tripdata_{rows_per_month}.csv")
+        if not os.path.exists(path) or args.regenerate:
+            print(f"Generating {rows_per_month} rows for {year}-{month:02d} -> {path}")
+            write_synthetic_csv("nyc_modern", path, rows_per_month, seed=args.seed + i, year=year, month=month)
+        paths.append(path)
+
+    conn = psycopg2.connect(args.dsn)
+    try:
+        prepare_raw(conn, args.raw_schema)
+        for path in paths[:-1]:
+            print(f"Loading history {os.path.basename(path)}: {load_month(conn, path)} rows")
+        report = {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "config": {"rows_per_month": rows_per_month, "history_months": args.history_months,
+                       "target": args.target, "raw_schema": args.raw_schema},
+            "runs": {},
+        }
+        # Baseline build; not part of the comparison
+        report["runs"]["initial_build"] = {"seconds": round(dbt_run(args.target, args.raw_schema, True), 3),
+                                           "months": args.history_months}
+        print(f"Loading new month {os.path.basename(paths[-1])}: {load_month(conn, paths[-1])} rows")
+        report["runs"]["incremental"] = {"seconds": round(dbt_run(args.target, args.raw_schema), 3), "months": 1}
+        report["runs"]["full_refresh"] = {"seconds": round(dbt_run(args.target, args.raw_schema, True), 3),
+                                          "months": args.history_months + 1}
+    finally:
+        conn.close()
+    incremental = report["runs"]["incremental"]["seconds"]
+    report["speedup"] = round(report["runs"]["full_refresh"]["seconds"] / incremental, 2) if incremental else None
+    output = json.dumps(report, indent=2)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a full and an incremental dbt run of stg_nyc_modern.")
+    parser.add_argument("--dsn", default=os.environ.get("BENCH_DSN"), required=not os.environ.get("BENCH_DSN"),
+                        help="libpq DSN of the dbt target's database (default: $BENCH_DSN)")
+    parser.add_argument("--target", default="bench", help="profiles.yml target with a scratch schema")
+    parser.add_argument("--raw-schema", default="city_cycles_bench_raw")
+    parser.add_argument("--rows-per-month", type=float, default=1e6)
+    parser.add_argument("--history-months", type=int, default=6)
+    parser.add_argument("--first-year", type=int, default=2023)
+    parser.add_argument("--first-month", type=int, default=1)
+    parser.add_argument("--data-dir", default="/tmp/city_cycles_bench")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--regenerate", action="store_true")
+    parser.add_argument("--out", help="Write the JSON report to this path")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
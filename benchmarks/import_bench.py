@@ -0,0 +1,80 @@
+"""Startup-time budget for the loader CLIs.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter for
+each entry point and fails when the cumulative import time goes over budget,
+or when a heavy dependency that should only be imported on use (pandas,
+boto3, psycopg2, ...) is pulled in at import:
+
+    python -m benchmarks.import_bench
+    python -m benchmarks.import_bench --budget-ms 150 --repeat 5 --top 15
+
+Exit status is non-zero on any violation, so it can run in CI.
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+# Module imported by each short-lived CLI invocation
+MODULES = ("data_models", "db.batch_load_from_s3", "db.batch_load_all_from_s3")
+# Must not be imported just by importing the modules above
+DEFERRED = ("pandas", "numpy", "pyarrow", "boto3", "botocore", "psycopg2", "psutil")
+DEFAULT_BUDGET_MS = 200
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr):
+    """``-X importtime`` output as ``[(module, self_us, cumulative_us, depth)]``."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def measure(module):
+    """Cumulative import time of ``module`` and every module it pulled in."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=REPO_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows = parse_importtime(proc.stderr)
+    # The module's own top-level row includes everything it imported; rows
+    # before it are interpreter startup, which every CLI pays regardless.
+    total_us = next(r[2] for r in rows if r[0] == module and r[3] == 0)
+    loaded = {r[0] for r in rows}
+    deferred = sorted(name for name in DEFERRED if name in loaded)
+    return {"module": module, "total_ms": total_us / 1000, "rows": rows, "deferred_loaded": deferred}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the import-time budget of the loader CLIs.")
+    parser.add_argument("--modules", nargs="*", default=list(MODULES))
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Maximum cumulative import time per module (default {DEFAULT_BUDGET_MS})")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module; the fastest is reported")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list per module")
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.modules:
+        runs = [measure(module) for _ in range(max(args.repeat, 1))]
+        best = min(runs, key=lambda r: r["total_ms"])
+        status = "ok" if best["total_ms"] <= args.budget_ms else "OVER BUDGET"
+        print(f"{module}: {best['total_ms']:.1f} ms (budget {args.budget_ms:.0f} ms) {status}")
+        for name, self_us, cumulative_us, _ in sorted(best["rows"], key=lambda r: -r[1])[:args.top]:
+            print(f"    {self_us / 1000:8.2f} ms self  {cumulative_us / 1000:8.2f} ms cumulative  {name}")
+        if status != "ok":
+            failures.append(f"{module} took {best['total_ms']:.1f} ms")
+        if best["deferred_loaded"]:
+            failures.append(f"{module} imports {', '.join(best['deferred_loaded'])} at import time")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""Stage-by-stage loader benchmark over synthetic trip CSVs.
+
+Times each loader stage separately (read, route, transform, serialize for
+COPY and, with --dsn, insert into a local Postgres) and writes throughput,
+RSS and allocation figures as JSON so runs can be diffed between commits:
+
+    python -m benchmarks.loader_bench run --rows 1e6 --out bench/after.json
+    python -m benchmarks.loader_bench compare bench/before.json bench/after.json
+
+Inserts go into TEMP tables that shadow the raw table names, so a benchmark
+never writes to the real staging tables and leaves nothing behind.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import resource
+import argparse
+import platform
+import subprocess
+import tracemalloc
+from datetime import datetime, timezone
+import psutil
+from data_models.base import BaseBikeShareRecord, normalize_header
+from data_models.csv_reader import read_csv_chunks
+from benchmarks.synthetic import MODELS, write_synthetic_csv
+
+STAGES = ("read", "route", "transform", "serialize", "insert")
+
+
+class StageTimer:
+    """Accumulates wall time, peak RSS and allocations for one named stage."""
+
+    def __init__(self, name, trace_alloc=False):
+        self.name = name
+        self.trace_alloc = trace_alloc
+        self.seconds = 0.0
+        self.calls = 0
+        self.rows = 0
+        self.peak_rss_mb = 0.0
+        self.alloc_blocks = 0
+        self.peak_traced_mb = 0.0
+        self._process = psutil.Process(os.getpid())
+
+    def __enter__(self):
+        if self.trace_alloc:
+            tracemalloc.reset_peak()
+        self._blocks = sys.getallocatedblocks()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds += time.perf_counter() - self._start
+        self.calls += 1
+        self.alloc_blocks += max(sys.getallocatedblocks() - self._blocks, 0)
+        self.peak_rss_mb = max(self.peak_rss_mb, self._process.memory_info().rss / 1024 / 1024)
+        if self.trace_alloc:
+            self.peak_traced_mb = max(self.peak_traced_mb, tracemalloc.get_traced_memory()[1] / 1024 / 1024)
+        return False
+
+    def result(self):
+        out = {
+            "seconds": round(self.seconds, 4),
+            "calls": self.calls,
+            "rows": self.rows,
+            "rows_per_sec": round(self.rows / self.seconds, 1) if self.seconds > 0 else None,
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "net_alloc_blocks": self.alloc_blocks,
+        }
+        if self.trace_alloc:
+            out["peak_traced_mb"] = round(self.peak_traced_mb, 1)
+        return out
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def _connect(dsn, model):
+    import psycopg2
+    conn = psycopg2.connect(dsn)
+    with conn.cursor() as cur:
+        cur.execute(model.get_schema_sql().replace("CREATE TABLE IF NOT EXISTS", "CREATE TEMP TABLE"))
+    return conn
+
+
+def bench_file(key, path, chunksize=10000, engine="c", write_mode="copy", dsn=None, trace_alloc=False):
+    """Run every stage over one CSV and return the per-stage results."""
+    model = MODELS[key]
+    timers = {stage: StageTimer(stage, trace_alloc) for stage in STAGES}
+    with timers["route"]:
+        with open(path, newline="") as f:
+            header = next(csv.reader(f))
+        routed = BaseBikeShareRecord.route_header(header, model.s3_prefix)
+    timers["route"].rows = 1
+    if routed is not model:
+        raise RuntimeError(f"{path} routed to {routed} instead of {model.__name__}")
+    conn = _connect(dsn, model) if dsn else None
+    cols = list(model.__dataclass_fields__.keys())
+    copy_sql = f"COPY {model.staging_table} ({', '.join(cols)}) FROM STDIN WITH (FORMAT csv)"
+    source_file = os.path.basename(path)
+    total_rows = 0
+    start = time.perf_counter()
+    try:
+        with open(path, "rb") as stream:
+            chunks = read_csv_chunks(stream, chunksize=chunksize, engine=engine, dtypes=model.get_csv_dtypes())
+            while True:
+                with timers["read"]:
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                chunk.columns = normalize_header(chunk.columns)
+                timers["read"].rows += len(chunk)
+                with timers["transform"]:
+                    df = model.to_dataframe(chunk, source_file)
+                timers["transform"].rows += len(df)
+                buffer = None
+                if write_mode == "copy":
+                    with timers["serialize"]:
+                        buffer = model._copy_buffer(df, cols)
+                    timers["serialize"].rows += len(df)
+                if conn is not None:
+                    # COPY the buffer serialized above, so "insert" is the database's
+                    # time alone; execute_values builds its rows inside the insert.
+                    with timers["insert"]:
+                        if buffer is not None:
+                            with conn.cursor() as cur:
+                                cur.copy_expert(copy_sql, buffer)
+                        else:
+                            model.to_database(df, mode=write_mode, conn=conn)
+                    timers["insert"].rows += len(df)
+                total_rows += len(df)
+                del chunk, df, buffer
+    finally:
+        if conn is not None:
+            conn.rollback()
+            conn.close()
+    wall = time.perf_counter() - start
+    stages = {name: t.result() for name, t in timers.items() if t.calls}
+    return {
+        "model": model.__name__,
+        "rows": total_rows,
+        "file_mb": round(os.path.getsize(path) / 1024 / 1024, 1),
+        "wall_seconds": round(wall, 4),
+        "rows_per_sec": round(total_rows / wall, 1) if wall > 0 else None,
+        "stages": stages,
+    }
+
+
+def run(args):
+    if args.trace_alloc:
+        tracemalloc.start()
+    keys = args.models or sorted(MODELS)
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {"rows": int(args.rows), "chunksize": args.chunksize, "engine": args.engine,
+                   "write_mode": args.write_mode, "insert": bool(args.dsn)},
+        "results": {},
+    }
+    for key in keys:
+        path = os.path.join(args.data_dir, f"{key}_{int(args.rows)}.csv")
+        if not os.path.exists(path) or args.regenerate:
+            print(f"Generating {int(args.rows)} rows for {key} -> {path}")
+            write_synthetic_csv(key, path, int(args.rows), seed=args.seed)
+        print(f"Benchmarking {key} ({path})")
+        report["results"][key] = bench_file(key, path, chunksize=args.chunksize, engine=args.engine,
+                                            write_mode=args.write_mode, dsn=args.dsn,
+                                            trace_alloc=args.trace_alloc)
+    # ru_maxrss is reported in KB on Linux
+    report["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    output = json.dumps(report, indent=2)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+def compare(args):
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    print(f"{'model':<16}{'stage':<12}{'before s':>12}{'after s':>12}{'change':>10}")
+    for key, result in after["results"].items():
+        old = before["results"].get(key)
+        if old is None:
+            continue
+        rows = [("total", old["wall_seconds"], result["wall_seconds"])]
+        rows += [(stage, old["stages"][stage]["seconds"], result["stages"][stage]["seconds"])
+                 for stage in STAGES if stage in old["stages"] and stage in result["stages"]]
+        for stage, b, a in rows:
+            change = f"{(a - b) / b * 100:+.1f}%" if b else "n/a"
+            print(f"{key:<16}{stage:<12}{b:>12.3f}{a:>12.3f}{change:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the S3->Postgres loader stages on synthetic data.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_parser = sub.add_parser("run", help="Generate data (if needed) and benchmark each stage")
+    run_parser.add_argument("--models", nargs="*", choices=sorted(MODELS), help="Default: all four schemas")
+    run_parser.add_argument("--rows", type=float, default=1e5, help="Rows per synthetic file, e.g. 1e5 to 1e8")
+    run_parser.add_argument("--chunksize", type=int, default=10000)
+    run_parser.add_argument("--engine", choices=["c", "pyarrow"], default="c")
+    run_parser.add_argument("--write-mode", choices=["copy", "execute_values"], default="copy")
+    run_parser.add_argument("--dsn", default=os.environ.get("BENCH_DSN"),
+                            help="libpq DSN of a local Postgres for the insert stage (default: $BENCH_DSN)")
+    run_parser.add_argument("--data-dir", default="/tmp/city_cycles_bench")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--regenerate", action="store_true")
+    run_parser.add_argument("--trace-alloc", action="store_true",
+                            help="Also record tracemalloc peaks per stage (slows every stage down)")
+    run_parser.add_argument("--out", help="Write the JSON report to this path")
+    run_parser.set_defaults(func=run)
+    compare_parser = sub.add_parser("compare", help="Diff two JSON reports stage by stage")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.set_defaults(func=compare)
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
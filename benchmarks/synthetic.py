@@ -0,0 +1,134 @@
+"""Synthetic trip CSVs in the raw formats of the four bike share models.
+
+Generated files use the exact headers, date formats and value shapes of the
+real Citi Bike and TfL extracts, with a realistic station pool (a few
+thousand stations with long names) so string-heavy columns cost what they
+cost in production. Rows are written in chunks, so files of 1e8 rows can be
+produced without holding them in memory.
+"""
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from data_models.london_bike import LondonLegacyBikeShareRecord, LondonModernBikeShareRecord
+from data_models.nyc_bike import NYCLegacyBikeShareRecord, NYCModernBikeShareRecord
+
+N_STATIONS = 2000
+STREETS = ["Broadway", "W 52 St", "E 17 St", "Park Ave", "Central Park S", "Hudson St", "Kingsway",
+           "Waterloo Road", "Belgrove Street", "Hyde Park Corner", "Bethnal Green Road", "Albert Embankment"]
+CROSS = ["& 8 Ave", "& Lexington Ave", "& Union Square", "King's Cross", "Southwark", "Holborn", "Mayfair"]
+
+# Registry key -> model, used by the CLI and the benchmark harness
+MODELS = {
+    "nyc_legacy": NYCLegacyBikeShareRecord,
+    "nyc_modern": NYCModernBikeShareRecord,
+    "london_legacy": LondonLegacyBikeShareRecord,
+    "london_modern": LondonModernBikeShareRecord,
+}
+
+
+@lru_cache(maxsize=None)
+def _stations(city):
+    rng = np.random.default_rng(0)
+    names = np.array([f"{STREETS[i % len(STREETS)]} {CROSS[(i // len(STREETS)) % len(CROSS)]} {i}"
+                      for i in range(N_STATIONS)], dtype=object)
+    if city == "nyc":
+        ids = np.array([f"{rng.integers(2000, 8999)}.{rng.integers(0, 99):02d}" for _ in range(N_STATIONS)], dtype=object)
+        lat = rng.uniform(40.63, 40.88, N_STATIONS)
+        lng = rng.uniform(-74.03, -73.88, N_STATIONS)
+    else:
+        ids = np.arange(1, N_STATIONS + 1)
+        lat = rng.uniform(51.45, 51.55, N_STATIONS)
+        lng = rng.uniform(-0.24, 0.0, N_STATIONS)
+    return names, ids, lat, lng
+
+
+def _trip_times(rng, n, year, month):
+    base = np.datetime64(f"{year:04d}-{month:02d}-01T00:00:00")
+    start = base + rng.integers(0, 28 * 24 * 3600, n).astype("timedelta64[s]")
+    duration = rng.gamma(2.0, 480.0, n).astype(np.int64) + 60
+    return pd.Series(start), pd.Series(start + duration.astype("timedelta64[s]")), duration
+
+
+def generate_chunk(key, n, rng, first_id=0, year=2023, month=6):
+    """Return ``n`` synthetic raw rows (raw CSV column names) for model ``key``."""
+    city = key.split("_")[0]
+    names, ids, lat, lng = _stations(city)
+    s = rng.integers(0, N_STATIONS, n)
+    e = rng.integers(0, N_STATIONS, n)
+    start, stop, duration = _trip_times(rng, n, year, month)
+    if key == "nyc_legacy":
+        millis = lambda ts: ts.dt.strftime("%Y-%m-%d %H:%M:%S") + "." + pd.Series(rng.integers(0, 9999, n)).astype(str).str.zfill(4)
+        return pd.DataFrame({
+            "tripduration": duration,
+            "starttime": millis(start),
+            "stoptime": millis(stop),
+            # Legacy Citi Bike station IDs were plain integers
+            "start station id": s + 72, "start station name": names[s],
+            "start station latitude": lat[s], "start station longitude": lng[s],
+            "end station id": e + 72, "end station name": names[e],
+            "end station latitude": lat[e], "end station longitude": lng[e],
+            "bikeid": rng.integers(14000, 45000, n),
+            "usertype": np.where(rng.random(n) < 0.8, "Subscriber", "Customer"),
+            "birth year": rng.integers(1950, 2004, n),
+            "gender": rng.integers(0, 3, n),
+        })
+    if key == "nyc_modern":
+        return pd.DataFrame({
+            "ride_id": [f"{v:016X}" for v in rng.integers(0, 2**63 - 1, n, dtype=np.int64)],
+            "rideable_type": np.where(rng.random(n) < 0.6, "classic_bike", "electric_bike"),
+            "started_at": start.dt.strftime("%Y-%m-%d %H:%M:%S"),
+            "ended_at": stop.dt.strftime("%Y-%m-%d %H:%M:%S"),
+            "start_station_name": names[s], "start_station_id": ids[s],
+            "end_station_name": names[e], "end_station_id": ids[e],
+            "start_lat": lat[s], "start_lng": lng[s], "end_lat": lat[e], "end_lng": lng[e],
+            "member_casual": np.where(rng.random(n) < 0.75, "member", "casual"),
+        })
+    if key == "london_legacy":
+        return pd.DataFrame({
+            "Rental Id": np.arange(first_id, first_id + n) + 90000000,
+            "Duration": duration,
+            "Bike Id": rng.integers(1, 20000, n),
+            "End Date": stop.dt.strftime("%d/%m/%Y %H:%M"),
+            "EndStation Id": ids[e], "EndStation Name": names[e],
+            "Start Date": start.dt.strftime("%d/%m/%Y %H:%M"),
+            "StartStation Id": ids[s], "StartStation Name": names[s],
+        })
+    if key == "london_modern":
+        return pd.DataFrame({
+            "Number": np.arange(first_id, first_id + n) + 130000000,
+            "Start date": start.dt.strftime("%Y-%m-%d %H:%M"),
+            "Start station number": ids[s], "Start station": names[s],
+            "End date": stop.dt.strftime("%Y-%m-%d %H:%M"),
+            "End station number": ids[e], "End station": names[e],
+            "Bike number": rng.integers(1, 60000, n),
+            "Bike model": np.where(rng.random(n) < 0.9, "CLASSIC", "PBSC_EBIKE"),
+            "Total duration": [f"{d // 60}m {d % 60}s" for d in duration],
+            "Total duration (ms)": duration * 1000,
+        })
+    raise ValueError(f"Unknown model key {key!r}, expected one of {sorted(MODELS)}")
+
+
+def write_synthetic_csv(key, path, rows, chunk_rows=1_000_000, seed=0, year=2023, month=6):
+    """Write ``rows`` synthetic rows for model ``key`` to ``path`` and return the path."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    written = 0
+    with open(path, "w", newline="") as f:
+        while written < rows:
+            n = min(chunk_rows, rows - written)
+            chunk = generate_chunk(key, n, rng, first_id=written, year=year, month=month)
+            chunk.to_csv(f, index=False, header=written == 0)
+            written += n
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Write a synthetic trip CSV for one model.")
+    parser.add_argument("model", choices=sorted(MODELS))
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=float, default=1e5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(write_synthetic_csv(args.model, args.path, int(args.rows), seed=args.seed))
@@ -296,7 +296,13 @@ if st.session_state.get('date_filter_applied', False) and applied_start_date and
 
         # --- Time of Day Analysis ---
         st.subheader("Time of Day Analysis")
-        hour_query = f"SELECT hour_of_day, ride_count FROM {MART_SCHEMA}.mart_{page.lower()}_hourly_patterns ORDER BY hour_of_day"
+        hour_query = f"""
+        SELECT hour_of_day, SUM(ride_count) AS ride_count
+        FROM {MART_SCHEMA}.mart_station_hourly_rollup
+        WHERE location = '{page.lower()}' AND {date_filter}
+        GROUP BY hour_of_day
+        ORDER BY hour_of_day
+        """
         hour_df = pd.read_sql(hour_query, conn)
         fig_hour = px.bar(hour_df, x='hour_of_day', y='ride_count', title=f"{page} Rides by Hour of Day")
         st.plotly_chart(fig_hour, use_container_width=True)
@@ -0,0 +1,172 @@
+import os
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from data_ingestion.utils import upload_fileobj_to_s3, upload_to_s3
+
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+REQUEST_TIMEOUT = (10, 120)  # (connect, read) seconds
+
+
+class RateLimiter:
+    """Per-host token bucket: at most ``rate`` requests/second, bursting to ``burst``.
+
+    Replaces a fixed sleep between files; concurrent workers share the
+    bucket, so adding workers never raises the request rate against a host.
+    """
+
+    def __init__(self, rate=2.0, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, (self.burst, now))
+                tokens = min(self.burst, tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                delay = (1 - tokens) / self.rate
+            time.sleep(delay)
+
+
+class HTTPFetcher:
+    """Fetch files over HTTP with bounded memory and bounded concurrency.
+
+    Response bodies are never held in memory: with ``to_s3=True`` each body
+    streams straight into a multipart S3 upload, otherwise it is written to
+    ``tmp_dir`` in ``chunk_bytes`` pieces, uploaded and removed. ``workers``
+    downloads run at once, each borrowing a pooled ``requests.Session`` so
+    TCP/TLS connections are reused across files, and every request first
+    takes a token from the shared per-host RateLimiter.
+    """
+
+    def __init__(self, workers=4, rate=2.0, to_s3=True, tmp_dir="/tmp", chunk_bytes=DOWNLOAD_CHUNK_BYTES,
+                 retries=3):
+        self.workers = workers
+        self.to_s3 = to_s3
+        self.tmp_dir = tmp_dir
+        self.chunk_bytes = chunk_bytes
+        self.limiter = RateLimiter(rate)
+        self._sessions = queue.Queue()
+        for _ in range(workers):
+            self._sessions.put(self._new_session(retries))
+
+    def _new_session(self, retries):
+        session = requests.Session()
+        retry = Retry(total=retries, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=("GET", "HEAD"))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def fetch(self, url, s3_key):
+        """Download ``url`` and store it at ``s3_key``; returns bytes transferred."""
+        session = self._sessions.get()
+        try:
+            self.limiter.wait(urlparse(url).netloc)
+            print(f"Downloading {url} -> s3 key {s3_key} ...")
+            with session.get(url, stream=True, timeout=REQUEST_TIMEOUT) as response:
+                response.raise_for_status()
+                if self.to_s3:
+                    response.raw.decode_content = True
+                    counter = _CountingReader(response.raw)
+                    upload_fileobj_to_s3(counter, s3_key)
+                    return counter.bytes_read
+                return self._fetch_via_disk(response, s3_key)
+        finally:
+            self._sessions.put(session)
+
+    def head(self, url):
+        """Size, ETag and Last-Modified of ``url`` from a HEAD request."""
+        session = self._sessions.get()
+        try:
+            self.limiter.wait(urlparse(url).netloc)
+            response = session.head(url, timeout=REQUEST_TIMEOUT, allow_redirects=True)
+            response.raise_for_status()
+        finally:
+            self._sessions.put(session)
+        size = response.headers.get("Content-Length")
+        return {
+            "size": int(size) if size is not None else None,
+            "etag": response.headers.get("ETag", "").strip('"') or None,
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+
+    def head_all(self, urls):
+        """HEAD ``urls`` concurrently; returns {url: metadata}, skipping failures."""
+        results = {}
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="head") as pool:
+            futures = {pool.submit(self.head, url): url for url in urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    results[url] = future.result()
+                except Exception as e:
+                    print(f"ERROR checking {url}: {e}")
+        return results
+
+    def _fetch_via_disk(self, response, s3_key):
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        local_path = os.path.join(self.tmp_dir, os.path.basename(s3_key))
+        size = 0
+        try:
+            with open(local_path, "wb") as f:
+                for block in response.iter_content(chunk_size=self.chunk_bytes):
+                    f.write(block)
+                    size += len(block)
+            upload_to_s3(local_path, s3_key)
+        finally:
+            if os.path.exists(local_path):
+                os.remove(local_path)
+        return size
+
+    def fetch_all(self, items):
+        """Fetch ``(url, s3_key)`` pairs concurrently.
+
+        Returns ``{"fetched": [(s3_key, bytes), ...], "errors": [(url, message), ...]}``;
+        one failed file does not stop the others.
+        """
+        fetched, errors = [], []
+        start = time.perf_counter()
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="fetch") as pool:
+            futures = {pool.submit(self.fetch, url, s3_key): (url, s3_key) for url, s3_key in items}
+            for future in as_completed(futures):
+                url, s3_key = futures[future]
+                try:
+                    size = future.result()
+                    fetched.append((s3_key, size))
+                    print(f"Uploaded {s3_key} ({size / 1024 / 1024:.1f} MB)")
+                except Exception as e:
+                    print(f"ERROR fetching {url}: {e}")
+                    errors.append((url, str(e)))
+        total_mb = sum(size for _, size in fetched) / 1024 / 1024
+        print(f"Fetched {len(fetched)} files ({total_mb:.1f} MB) in {time.perf_counter() - start:.1f}s, "
+              f"{len(errors)} errors.")
+        return {"fetched": fetched, "errors": errors}
+
+
+class _CountingReader:
+    """Pass-through reader that counts the bytes handed to the uploader."""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self._raw.read(size)
+        self.bytes_read += len(data)
+        return data
@@ -3,13 +3,11 @@ load_dotenv()
 import os
 import re
 import asyncio
-from datetime import datetime
 from urllib.parse import urljoin
 import shutil
-from data_ingestion.utils import upload_to_s3
-from playwright.async_api import async_playwright
+from data_ingestion.fetcher import HTTPFetcher
+from data_ingestion.london_manifest import LondonManifest
 import time
-import requests
 
 LONDON_BASE_URL = "https://cycling.data.tfl.gov.uk/"
 LOCAL_TMP_DIR = "/tmp/london_bike/"
@@ -17,72 +15,117 @@ S3_PREFIX = "london_csv"
 
 os.makedirs(LOCAL_TMP_DIR, exist_ok=True)
 
-async def list_and_download_london_csv_files():
+LINK_SELECTOR = 'tbody#tbody-content a'
+# Scrolling stops once this many consecutive scrolls load no new links.
+SCROLL_PLATEAU_ROUNDS = 2
+MAX_SCROLLS = 30
+
+def match_journey_files(hrefs, min_year=2019):
+    """(file_url, href) pairs for Journey Data Extract CSVs from ``min_year`` on."""
+    pattern = re.compile(r"(Journey\s?Data\s?Extract.*\.csv)", re.IGNORECASE)
+    files = []
+    for href in hrefs:
+        if href and pattern.search(href):
+            year_match = re.search(r"(20\d{2})", href)
+            if year_match and int(year_match.group(1)) >= min_year:
+                files.append((urljoin(LONDON_BASE_URL, href), href))
+    return files
+
+async def list_london_csv_files(scroll_delay=1.0):
+    # Only needed when the listing is re-scraped, not for manifest-driven runs
+    from playwright.async_api import async_playwright
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(accept_downloads=True)
-        page = await context.new_page()
+        page = await browser.new_page()
         await page.goto(LONDON_BASE_URL)
-        # Scroll the #full-width-content container for up to 30 seconds
+        await page.wait_for_selector(LINK_SELECTOR, timeout=20000)
+        # The table lazy-loads as #full-width-content scrolls; keep scrolling
+        # only while that still adds links.
         start_time = time.time()
-        for _ in range(30):
+        count, stalled = 0, 0
+        for _ in range(MAX_SCROLLS):
             await page.evaluate("""
                 var el = document.querySelector('#full-width-content');
                 if (el) el.scrollTop = el.scrollHeight;
             """)
-            await asyncio.sleep(1)
-        # Print the outer HTML of the container for debugging
-        container = await page.query_selector('#full-width-content')
-        html = await page.evaluate("(el) => el ? el.outerHTML : 'NOT FOUND'", container)
-        print("\n--- #full-width-content outerHTML (truncated) ---\n", html[:2000], "\n--- END ---\n")
-        # Now collect all links
-        await page.wait_for_selector('tbody#tbody-content a', timeout=20000)
-        links = await page.query_selector_all('tbody#tbody-content a')
-        print("All links found on page:")
-        for link in links:
-            href = await link.get_attribute('href')
-            print(href)
-        current_year = datetime.now().year
-        pattern = re.compile(r"(Journey\s?Data\s?Extract.*\.csv)", re.IGNORECASE)
-        files = []
-        for link in links:
-            href = await link.get_attribute('href')
-            if href and pattern.search(href):
-                year_match = re.search(r"(20\d{2})", href)
-                if year_match and int(year_match.group(1)) >= 2019:
-                    file_url = urljoin(LONDON_BASE_URL, href)
-                    files.append((file_url, href))
-        print(f"Matched {len(files)} files for 2019 and later.")
-        print(f"Sample files: {[f[0] for f in files[:5]]}")
-        # Use requests to download the files
-        for file_url, filename in files:
-            local_path = os.path.join(LOCAL_TMP_DIR, os.path.basename(filename))
-            print(f"Downloading {file_url} to {local_path} ...")
-            response = requests.get(file_url)
-            response.raise_for_status()
-            with open(local_path, 'wb') as f:
-                f.write(response.content)
-            # If the file ends with .xls but is actually a CSV, rename it to .csv
-            if local_path.lower().endswith('.xls'):
-                new_local_path = local_path[:-4] + '.csv'
-                os.rename(local_path, new_local_path)
-                local_path = new_local_path
-                s3_filename = os.path.basename(local_path)
-            else:
-                s3_filename = os.path.basename(filename)
-            s3_key = f"{S3_PREFIX}/{s3_filename}"
-            upload_to_s3(local_path, s3_key)
-            os.remove(local_path)
-            print(f"Uploaded and cleaned up: {local_path}")
-            await asyncio.sleep(1)  # Respectful delay
+            await asyncio.sleep(scroll_delay)
+            new_count = await page.eval_on_selector_all(LINK_SELECTOR, "els => els.length")
+            stalled = stalled + 1 if new_count == count else 0
+            count = new_count
+            if stalled >= SCROLL_PLATEAU_ROUNDS:
+                break
+        hrefs = await page.eval_on_selector_all(LINK_SELECTOR, "els => els.map(el => el.getAttribute('href'))")
         await browser.close()
+    print(f"Found {len(hrefs)} links in {time.time() - start_time:.1f}s of scrolling.")
+    files = match_journey_files(hrefs)
+    print(f"Matched {len(files)} files for 2019 and later.")
+    print(f"Sample files: {[f[0] for f in files[:5]]}")
+    return files
+
+def s3_key_for(href):
+    """S3 key for a listed file; some extracts are published as .xls but are really CSVs."""
+    filename = os.path.basename(href)
+    if filename.lower().endswith('.xls'):
+        filename = filename[:-4] + '.csv'
+    return f"{S3_PREFIX}/{filename}"
+
+def private_bucket_sizes(prefix=S3_PREFIX):
+    """{s3_key: size} for everything already uploaded under ``prefix``."""
+    from data_ingestion.utils import check_s3_bucket, get_private_s3
+    sizes = {}
+    paginator = get_private_s3().get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=check_s3_bucket(), Prefix=f"{prefix}/"):
+        for obj in page.get("Contents", []):
+            sizes[obj["Key"]] = obj["Size"]
+    return sizes
+
+async def list_and_download_london_csv_files(workers=4, rate=2.0, to_s3=True, max_age_hours=24,
+                                             refresh=False, recheck=False):
+    manifest = LondonManifest()
+    fetcher = HTTPFetcher(workers=workers, rate=rate, to_s3=to_s3, tmp_dir=LOCAL_TMP_DIR)
+    if refresh or not manifest.is_fresh(max_age_hours * 3600):
+        new = manifest.update_listing(await list_london_csv_files(), s3_key_for)
+        print(f"{len(new)} files not seen in previous listings.")
+    else:
+        new = []
+        print(f"Using cached listing from {manifest.path} ({len(manifest.files)} files); pass --refresh to re-scrape.")
+    # Only new files need a HEAD for size/ETag/Last-Modified unless asked to recheck all.
+    to_check = list(manifest.files) if recheck else new
+    urls = {manifest.files[href]["url"]: href for href in to_check}
+    metadata = await asyncio.to_thread(fetcher.head_all, list(urls))
+    for url, meta in metadata.items():
+        manifest.update_metadata(urls[url], meta)
+    pending = manifest.pending(private_bucket_sizes())
+    manifest.save()
+    print(f"{len(pending)} of {len(manifest.files)} files need fetching.")
+    # The fetcher is thread-based; run it off the event loop.
+    result = await asyncio.to_thread(fetcher.fetch_all, [(url, s3_key_for(href)) for url, href in pending])
+    for s3_key, _ in result["fetched"]:
+        manifest.mark_uploaded(s3_key)
+    manifest.save()
     try:
         shutil.rmtree(LOCAL_TMP_DIR)
     except Exception:
         pass
+    return result
 
-def process_and_upload_london_files():
-    asyncio.run(list_and_download_london_csv_files())
+def process_and_upload_london_files(workers=4, rate=2.0, to_s3=True, max_age_hours=24, refresh=False, recheck=False):
+    return asyncio.run(list_and_download_london_csv_files(workers=workers, rate=rate, to_s3=to_s3,
+                                                          max_age_hours=max_age_hours, refresh=refresh,
+                                                          recheck=recheck))
 
 if __name__ == "__main__":
-    process_and_upload_london_files()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Fetch TfL Journey Data Extract CSVs into S3.")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent downloads")
+    parser.add_argument("--rate", type=float, default=2.0, help="Max requests/second to the TfL host")
+    parser.add_argument("--via-disk", action="store_true",
+                        help="Stream each file to LOCAL_TMP_DIR before uploading instead of straight into S3")
+    parser.add_argument("--max-age-hours", type=float, default=24,
+                        help="Reuse the cached listing without launching a browser if it is younger than this")
+    parser.add_argument("--refresh", action="store_true", help="Always re-scrape the listing page")
+    parser.add_argument("--recheck", action="store_true",
+                        help="HEAD every listed file, not just new ones, to catch republished extracts")
+    args = parser.parse_args()
+    process_and_upload_london_files(workers=args.workers, rate=args.rate, to_s3=not args.via_disk,
+                                    max_age_hours=args.max_age_hours, refresh=args.refresh, recheck=args.recheck)
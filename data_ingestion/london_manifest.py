@@ -0,0 +1,94 @@
+import os
+import json
+import time
+from datetime import datetime, timezone
+
+DEFAULT_MANIFEST_PATH = os.path.expanduser("~/.cache/city_cycles/london_manifest.json")
+
+
+class LondonManifest:
+    """Local cache of the TfL file listing.
+
+    ``files`` maps each href to its URL, target S3 key, size, ETag and
+    Last-Modified as last seen on the TfL host, plus the ETag/size it had
+    when it was uploaded. ``listed_at`` records when the page was last
+    scraped, so a run inside ``max_age`` can skip the browser entirely.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("LONDON_MANIFEST_PATH", DEFAULT_MANIFEST_PATH)
+        self.data = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {"listed_at": None, "files": {}}
+        with open(self.path) as f:
+            return json.load(f)
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.data, f, indent=2)
+        # Atomic replace, so an interrupted run never leaves a truncated manifest
+        os.replace(tmp_path, self.path)
+
+    @property
+    def files(self):
+        return self.data["files"]
+
+    def is_fresh(self, max_age_seconds):
+        listed_at = self.data.get("listed_at")
+        return listed_at is not None and time.time() - listed_at < max_age_seconds
+
+    def listed(self):
+        """(file_url, href) pairs from the cached listing."""
+        return [(entry["url"], href) for href, entry in self.files.items()]
+
+    def update_listing(self, files, s3_key_for):
+        """Record a fresh scrape; returns the hrefs not seen before."""
+        new = []
+        for url, href in files:
+            if href not in self.files:
+                self.files[href] = {"url": url, "s3_key": s3_key_for(href)}
+                new.append(href)
+        self.data["listed_at"] = time.time()
+        return new
+
+    def update_metadata(self, href, metadata):
+        self.files[href].update(metadata)
+
+    def mark_uploaded(self, s3_key):
+        for entry in self.files.values():
+            if entry["s3_key"] == s3_key:
+                entry["uploaded_etag"] = entry.get("etag")
+                entry["uploaded_size"] = entry.get("size")
+                entry["uploaded_at"] = datetime.now(timezone.utc).isoformat()
+
+    def pending(self, bucket_sizes):
+        """(file_url, href) pairs that still need fetching.
+
+        ``bucket_sizes`` maps S3 keys already in the private bucket to their
+        size. A file is pending if its key is missing from the bucket, or if
+        the host now reports a different ETag or size than the copy we
+        uploaded (a republished extract).
+        """
+        pending = []
+        for href, entry in self.files.items():
+            key = entry["s3_key"]
+            if key not in bucket_sizes:
+                pending.append((entry["url"], href))
+            elif "uploaded_size" not in entry:
+                # Uploaded before the manifest existed: adopt the bucket copy
+                # as the baseline unless its size already disagrees.
+                if entry.get("size") is not None and entry["size"] != bucket_sizes[key]:
+                    pending.append((entry["url"], href))
+                else:
+                    entry["uploaded_etag"] = entry.get("etag")
+                    entry["uploaded_size"] = bucket_sizes[key]
+            elif entry.get("uploaded_etag") and entry.get("etag") and entry["etag"] != entry["uploaded_etag"]:
+                pending.append((entry["url"], href))
+            elif entry.get("uploaded_size") is not None and entry.get("size") is not None \
+                    and entry["size"] != entry["uploaded_size"]:
+                pending.append((entry["url"], href))
+        return pending
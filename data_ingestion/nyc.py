@@ -1,50 +1,54 @@
-from dotenv import load_dotenv
-load_dotenv()
 import os
-import re
-import boto3
+import zlib
 from datetime import datetime
 import zipfile
 import shutil
-from data_ingestion.utils import upload_to_s3
+import tempfile
+from data_ingestion.utils import upload_to_s3, upload_fileobj_to_s3, GzipCompressingReader, get_private_s3
+from data_models.settings import get_settings
 
-S3_BUCKET = os.environ.get("S3_BUCKET")
 NYC_PUBLIC_BUCKET = "tripdata"
 LOCAL_TMP_DIR = "/tmp/nyc_citibike/"
+# Nested zips are spooled in memory up to this size before spilling to disk
+NESTED_ZIP_SPOOL_BYTES = 256 * 1024 * 1024
+COPY_BLOCK_BYTES = 8 * 1024 * 1024
 
 # Ensure local temp dir exists
 os.makedirs(LOCAL_TMP_DIR, exist_ok=True)
 
-# Use unsigned config for public S3 bucket
-from botocore import UNSIGNED
-from botocore.client import Config
-public_s3 = boto3.client("s3", config=Config(signature_version=UNSIGNED))
+_public_s3 = None
 
-def list_nyc_citibike_files(start_year=2018, end_year=None):
+def get_public_s3():
+    """Unsigned client for the public tripdata bucket, created on first use."""
+    global _public_s3
+    if _public_s3 is None:
+        import boto3
+        from botocore import UNSIGNED
+        from botocore.client import Config
+        _public_s3 = boto3.client("s3", config=Config(signature_version=UNSIGNED))
+    return _public_s3
+
+def list_nyc_citibike_objects(start_year=2018, end_year=None, full_refresh=False):
+    """Matching archives as dicts with Key, Size and ETag, served from the S3 inventory cache."""
+    from data_models.inventory import get_inventory
     if end_year is None:
         end_year = datetime.now().year
-    print(f"Listing files in s3://{NYC_PUBLIC_BUCKET}/ ...")
-    paginator = public_s3.get_paginator("list_objects_v2")
-    files = []
-    for page in paginator.paginate(Bucket=NYC_PUBLIC_BUCKET):
-        for obj in page.get("Contents", []):
-            key = obj["Key"]
-            # Only .zip files
-            if not key.endswith(".zip"):
-                continue
-            # Extract year from filename
-            match = re.match(r"(\d{4})", os.path.basename(key))
-            if match:
-                year = int(match.group(1))
-                if start_year <= year <= end_year:
-                    files.append(key)
-    print(f"Matched {len(files)} files for years {start_year}-{end_year}.")
-    print(f"Sample files: {files[:5]}")
-    return files
+    inventory = get_inventory()
+    inventory.refresh(get_public_s3(), NYC_PUBLIC_BUCKET, full=full_refresh)
+    # Only .zip files named by year or year+month (e.g. 2019-..., 202302-...)
+    objects = [{"Key": row["key"], "Size": row["size"], "ETag": row["etag"]}
+               for row in inventory.objects(NYC_PUBLIC_BUCKET, start_year=start_year, end_year=end_year,
+                                            suffixes=(".zip",))]
+    print(f"Matched {len(objects)} files for years {start_year}-{end_year}.")
+    print(f"Sample files: {[obj['Key'] for obj in objects[:5]]}")
+    return objects
+
+def list_nyc_citibike_files(start_year=2018, end_year=None):
+    return [obj["Key"] for obj in list_nyc_citibike_objects(start_year, end_year)]
 
 def download_file_from_s3(bucket, key, dest_path):
     print(f"Downloading s3://{bucket}/{key} to {dest_path} ...")
-    public_s3.download_file(bucket, key, dest_path)
+    get_public_s3().download_file(bucket, key, dest_path)
 
 def is_valid_zip(path):
     try:
@@ -104,8 +108,71 @@ def process_path(path, s3_prefix):
             except Exception:
                 pass
 
-def download_unzip_upload_all(start_year=2019, end_year=None):
-    print(f"Using S3 bucket: {S3_BUCKET}")
+def stream_zip_to_s3(zip_source, s3_prefix, transcode=None):
+    """
+    Upload every CSV inside a zip to S3 without extracting it to disk:
+    - CSV members are streamed straight into a multipart upload; zipfile
+      checks each member's CRC as the last bytes are read, so a corrupt
+      member aborts its upload instead of landing in S3
+    - Nested zips are spooled (memory first, then a temp file) and recursed into
+    - transcode="gzip" compresses members on the fly and uploads them as .csv.gz
+    Returns the number of CSVs uploaded.
+    """
+    uploaded = 0
+    with zipfile.ZipFile(zip_source) as zf:
+        for info in zf.infolist():
+            name = os.path.basename(info.filename)
+            if info.is_dir() or name.startswith("._") or "__MACOSX" in info.filename:
+                continue
+            if name.endswith(".zip"):
+                print(f"[ZIP] {info.filename} (nested)")
+                with zf.open(info) as member, tempfile.SpooledTemporaryFile(
+                        max_size=NESTED_ZIP_SPOOL_BYTES, dir=LOCAL_TMP_DIR) as spool:
+                    shutil.copyfileobj(member, spool, COPY_BLOCK_BYTES)
+                    spool.seek(0)
+                    uploaded += stream_zip_to_s3(spool, s3_prefix, transcode)
+            elif name.endswith(".csv"):
+                print(f"[CSV] {info.filename} ({info.file_size / 1024 / 1024:.1f} MB uncompressed)")
+                with zf.open(info) as member:
+                    if transcode == "gzip":
+                        upload_fileobj_to_s3(GzipCompressingReader(member), f"{s3_prefix}/{name}.gz")
+                    else:
+                        upload_fileobj_to_s3(member, f"{s3_prefix}/{name}")
+                uploaded += 1
+            else:
+                print(f"[SKIP] Unsupported member: {info.filename}")
+    return uploaded
+
+def process_zip_streaming(path, s3_prefix, transcode=None):
+    """Streaming counterpart of process_path for a downloaded archive; always removes it."""
+    try:
+        count = stream_zip_to_s3(path, s3_prefix, transcode)
+        print(f"Streamed {count} CSVs from {path}")
+    except (zipfile.BadZipFile, zlib.error, EOFError) as e:
+        print(f"ERROR: Skipping invalid zip file {path}: {e}")
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+def download_unzip_upload_pipelined(start_year=2019, end_year=None, transcode=None, download_workers=2,
+                                    unzip_workers=2, upload_workers=4, disk_budget_gb=20,
+                                    multipart_chunksize_mb=64, max_concurrency=4):
+    """Run the download/unzip/upload stages concurrently (see data_ingestion.pipeline)."""
+    from boto3.s3.transfer import TransferConfig
+    from data_ingestion.pipeline import TransferPipeline
+    config = TransferConfig(multipart_chunksize=multipart_chunksize_mb * 1024 * 1024, max_concurrency=max_concurrency)
+    pipeline = TransferPipeline(
+        get_public_s3(), get_private_s3(), NYC_PUBLIC_BUCKET, get_settings().require_bucket(), "nyc_csv", LOCAL_TMP_DIR,
+        download_workers=download_workers, unzip_workers=unzip_workers, upload_workers=upload_workers,
+        disk_budget_bytes=int(disk_budget_gb * 1024 ** 3), download_config=config, upload_config=config,
+        transcode=transcode,
+    )
+    result = pipeline.run(list_nyc_citibike_objects(start_year, end_year))
+    print(f"Uploaded {len(result['uploaded'])} CSVs, {len(result['errors'])} errors.")
+    return result
+
+def download_unzip_upload_all(start_year=2019, end_year=None, streaming=True, transcode=None):
+    print(f"Using S3 bucket: {get_settings().s3_bucket}")
     files = list_nyc_citibike_files(start_year, end_year)
     print(f"Found {len(files)} files to process.")
     for key in files:
@@ -114,7 +181,10 @@ def download_unzip_upload_all(start_year=2019, end_year=None):
         try:
             download_file_from_s3(NYC_PUBLIC_BUCKET, key, local_path)
             try:
-                process_path(local_path, "nyc_csv")
+                if streaming:
+                    process_zip_streaming(local_path, "nyc_csv", transcode)
+                else:
+                    process_path(local_path, "nyc_csv")
             except Exception as e:
                 print(f"ERROR: Failed to process {local_path}: {e}")
         except Exception as e:
@@ -122,4 +192,28 @@ def download_unzip_upload_all(start_year=2019, end_year=None):
         print(f"Done: {fname}")
 
 if __name__ == "__main__":
-    download_unzip_upload_all() 
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Copy Citi Bike trip CSVs from the public tripdata bucket to S3.")
+    parser.add_argument("--extract", action="store_true",
+                        help="Use the legacy extract-to-disk path instead of streaming zip members")
+    parser.add_argument("--gzip", action="store_true", help="Transcode CSVs to .csv.gz while streaming")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="Run download, unzip and upload concurrently on bounded thread pools")
+    parser.add_argument("--download-workers", type=int, default=2)
+    parser.add_argument("--unzip-workers", type=int, default=2)
+    parser.add_argument("--upload-workers", type=int, default=4)
+    parser.add_argument("--disk-budget-gb", type=float, default=20,
+                        help="Scratch space the pipelined mode may use in LOCAL_TMP_DIR")
+    parser.add_argument("--multipart-chunksize-mb", type=int, default=64)
+    parser.add_argument("--max-concurrency", type=int, default=4,
+                        help="Threads per individual S3 transfer")
+    args = parser.parse_args()
+    transcode = "gzip" if args.gzip else None
+    if args.pipelined:
+        download_unzip_upload_pipelined(
+            transcode=transcode, download_workers=args.download_workers, unzip_workers=args.unzip_workers,
+            upload_workers=args.upload_workers, disk_budget_gb=args.disk_budget_gb,
+            multipart_chunksize_mb=args.multipart_chunksize_mb, max_concurrency=args.max_concurrency,
+        )
+    else:
+        download_unzip_upload_all(streaming=not args.extract, transcode=transcode) 
\ No newline at end of file
@@ -0,0 +1,199 @@
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from boto3.s3.transfer import TransferConfig
+
+DEFAULT_DOWNLOAD_CONFIG = TransferConfig(multipart_chunksize=32 * 1024 * 1024, max_concurrency=8)
+DEFAULT_UPLOAD_CONFIG = TransferConfig(
+    multipart_threshold=64 * 1024 * 1024,
+    multipart_chunksize=64 * 1024 * 1024,
+    max_concurrency=4,
+)
+COPY_BLOCK_BYTES = 8 * 1024 * 1024
+
+
+class DiskBudget:
+    """Counting semaphore over bytes of local scratch space.
+
+    acquire() blocks while the reservation would exceed the budget, which is
+    what applies backpressure to the download stage. A single item larger
+    than the whole budget is admitted once nothing else is reserved.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, nbytes):
+        with self._cond:
+            while self.used > 0 and self.used + nbytes > self.max_bytes:
+                self._cond.wait()
+            self.used += nbytes
+
+    def release(self, nbytes):
+        with self._cond:
+            self.used -= nbytes
+            self._cond.notify_all()
+
+
+class _Archive:
+    """A local zip plus the number of its pipeline tasks still running."""
+
+    def __init__(self, name, path, reserved, parent=None, pending=0):
+        self.name = name
+        self.path = path
+        self.reserved = reserved
+        self.parent = parent
+        self.pending = pending
+        self.lock = threading.Lock()
+
+
+class TransferPipeline:
+    """Concurrent download -> unzip -> upload pipeline for zipped trip archives.
+
+    Three bounded thread pools run side by side:
+    - download: copies archives from the source bucket to local scratch space
+    - unzip: opens each archive, spools nested zips to scratch, and queues
+      one upload per CSV member
+    - upload: streams a member out of its archive into a multipart upload
+      (decompression happens here, as the upload reads)
+    Every archive reserves its size (twice, to cover nested-zip spooling)
+    against a DiskBudget before it is downloaded and releases it once its
+    last member is uploaded, so scratch usage stays under the budget.
+
+    Clients and buckets are injected so the pipeline can run against a local
+    S3 stand-in (e.g. moto) in tests.
+    """
+
+    def __init__(self, source_client, dest_client, source_bucket, dest_bucket, s3_prefix, tmp_dir,
+                 download_workers=2, unzip_workers=2, upload_workers=4, disk_budget_bytes=20 * 1024 ** 3,
+                 download_config=None, upload_config=None, transcode=None):
+        self.source_client = source_client
+        self.dest_client = dest_client
+        self.source_bucket = source_bucket
+        self.dest_bucket = dest_bucket
+        self.s3_prefix = s3_prefix
+        self.tmp_dir = tmp_dir
+        self.download_workers = download_workers
+        self.unzip_workers = unzip_workers
+        self.upload_workers = upload_workers
+        self.budget = DiskBudget(disk_budget_bytes)
+        self.download_config = download_config or DEFAULT_DOWNLOAD_CONFIG
+        self.upload_config = upload_config or DEFAULT_UPLOAD_CONFIG
+        self.transcode = transcode
+        self.uploaded = []
+        self.errors = []
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self._done = threading.Condition(self._lock)
+
+    def run(self, objects):
+        """Process ``objects`` (dicts with Key and Size, as returned by list_objects_v2).
+
+        Returns ``{"uploaded": [...s3 keys], "errors": [(name, message), ...]}``.
+        """
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        with ThreadPoolExecutor(self.download_workers, thread_name_prefix="download") as self._downloads, \
+                ThreadPoolExecutor(self.unzip_workers, thread_name_prefix="unzip") as self._unzips, \
+                ThreadPoolExecutor(self.upload_workers, thread_name_prefix="upload") as self._uploads:
+            for obj in objects:
+                reserved = 2 * obj.get("Size", 0)
+                # Blocks here when scratch space is exhausted: backpressure on downloads.
+                self.budget.acquire(reserved)
+                with self._lock:
+                    self._outstanding += 1
+                self._downloads.submit(self._download, obj["Key"], reserved)
+            with self._done:
+                while self._outstanding:
+                    self._done.wait()
+        return {"uploaded": self.uploaded, "errors": self.errors}
+
+    # --- stages ------------------------------------------------------------
+
+    def _download(self, key, reserved):
+        name = os.path.basename(key)
+        path = os.path.join(self.tmp_dir, name)
+        # The download task itself holds the first reference
+        archive = _Archive(name, path, reserved, pending=1)
+        try:
+            print(f"[download] s3://{self.source_bucket}/{key}")
+            self.source_client.download_file(self.source_bucket, key, path, Config=self.download_config)
+            self._submit(archive, self._unzips, self._unzip, archive)
+        except Exception as e:
+            self._fail(name, e)
+        finally:
+            self._finish(archive)
+
+    def _unzip(self, archive):
+        try:
+            with zipfile.ZipFile(archive.path) as zf:
+                for info in zf.infolist():
+                    base = os.path.basename(info.filename)
+                    if info.is_dir() or base.startswith("._") or "__MACOSX" in info.filename:
+                        continue
+                    if base.endswith(".zip"):
+                        fd, nested_path = tempfile.mkstemp(suffix=".zip", dir=self.tmp_dir)
+                        with zf.open(info) as member, os.fdopen(fd, "wb") as out:
+                            shutil.copyfileobj(member, out, COPY_BLOCK_BYTES)
+                        nested = _Archive(f"{archive.name}/{info.filename}", nested_path, 0, parent=archive)
+                        with archive.lock:
+                            archive.pending += 1
+                        self._submit(nested, self._unzips, self._unzip, nested)
+                    elif base.endswith(".csv"):
+                        self._submit(archive, self._uploads, self._upload, archive, info.filename)
+                    else:
+                        print(f"[SKIP] Unsupported member: {info.filename}")
+        except Exception as e:
+            self._fail(archive.name, e)
+        finally:
+            self._finish(archive)
+
+    def _upload(self, archive, member_name):
+        from data_ingestion.utils import GzipCompressingReader
+        base = os.path.basename(member_name)
+        try:
+            with zipfile.ZipFile(archive.path) as zf, zf.open(member_name) as member:
+                body, key = member, f"{self.s3_prefix}/{base}"
+                if self.transcode == "gzip":
+                    body, key = GzipCompressingReader(member), key + ".gz"
+                print(f"[upload] {archive.name}:{member_name} -> s3://{self.dest_bucket}/{key}")
+                self.dest_client.upload_fileobj(body, self.dest_bucket, key, Config=self.upload_config)
+            with self._lock:
+                self.uploaded.append(key)
+        except Exception as e:
+            self._fail(f"{archive.name}:{member_name}", e)
+        finally:
+            self._finish(archive)
+
+    # --- bookkeeping -------------------------------------------------------
+
+    def _submit(self, archive, pool, fn, *args):
+        with archive.lock:
+            archive.pending += 1
+        pool.submit(fn, *args)
+
+    def _finish(self, archive):
+        """Drop one task reference; the last one deletes the file and frees its budget."""
+        with archive.lock:
+            archive.pending -= 1
+            if archive.pending:
+                return
+        if os.path.exists(archive.path):
+            os.remove(archive.path)
+        if archive.parent is not None:
+            self._finish(archive.parent)
+            return
+        self.budget.release(archive.reserved)
+        print(f"Done: {archive.name}")
+        with self._done:
+            self._outstanding -= 1
+            self._done.notify_all()
+
+    def _fail(self, name, error):
+        print(f"ERROR: {name}: {error}")
+        with self._lock:
+            self.errors.append((name, str(error)))
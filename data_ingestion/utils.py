@@ -1,24 +1,71 @@
-from dotenv import load_dotenv
-load_dotenv()
-
-import os
-import boto3
+import zlib
 import logging
+from data_models.settings import get_settings, get_s3_client
 
-S3_BUCKET = os.environ.get("S3_BUCKET")
-if not S3_BUCKET:
-    logging.error("S3_BUCKET environment variable is not set! Please set S3_BUCKET before running the script.")
-    raise ValueError("S3_BUCKET environment variable is not set!")
-
-private_s3 = boto3.client("s3")
+# Multipart settings for streamed uploads: parts are buffered in memory, so
+# memory per upload is roughly multipart_chunksize * max_concurrency.
+STREAM_UPLOAD_SETTINGS = dict(
+    multipart_threshold=64 * 1024 * 1024,
+    multipart_chunksize=64 * 1024 * 1024,
+    max_concurrency=4,
+)
 
 def check_s3_bucket():
-    if not S3_BUCKET:
+    """The project bucket from S3_BUCKET (environment or .env); raises if it is not set."""
+    try:
+        return get_settings().require_bucket()
+    except ValueError:
         logging.error("S3_BUCKET environment variable is not set! Please set S3_BUCKET before running the script.")
-        raise ValueError("S3_BUCKET environment variable is not set!")
-    return S3_BUCKET
+        raise
+
+def get_private_s3():
+    """Client for the project bucket, created on first use rather than at import."""
+    return get_s3_client()
+
+def stream_upload_config(**overrides):
+    from boto3.s3.transfer import TransferConfig
+    return TransferConfig(**{**STREAM_UPLOAD_SETTINGS, **overrides})
 
 def upload_to_s3(local_path, s3_key):
-    check_s3_bucket()
-    print(f"Uploading CSV: {local_path} to s3://{S3_BUCKET}/{s3_key} ...")
-    private_s3.upload_file(local_path, S3_BUCKET, s3_key) 
\ No newline at end of file
+    bucket = check_s3_bucket()
+    print(f"Uploading CSV: {local_path} to s3://{bucket}/{s3_key} ...")
+    get_private_s3().upload_file(local_path, bucket, s3_key)
+
+def upload_fileobj_to_s3(fileobj, s3_key, config=None):
+    """Stream a readable file object to S3 as a (multipart) upload.
+
+    If reading ``fileobj`` raises part-way (e.g. a zip member failing its CRC
+    check), the multipart upload is aborted and nothing is written.
+    """
+    bucket = check_s3_bucket()
+    print(f"Streaming upload to s3://{bucket}/{s3_key} ...")
+    get_private_s3().upload_fileobj(fileobj, bucket, s3_key, Config=config or stream_upload_config())
+
+class GzipCompressingReader:
+    """Readable file object yielding the gzip compression of another one.
+
+    Lets a CSV be transcoded on the fly while it streams into an upload,
+    without writing an intermediate file.
+    """
+
+    def __init__(self, raw, level=6, block_size=8 * 1024 * 1024):
+        self._raw = raw
+        self._block_size = block_size
+        # wbits=31 produces a gzip container rather than a raw zlib stream
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        self._buffer = bytearray()
+        self._eof = False
+
+    def read(self, size=-1):
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            block = self._raw.read(self._block_size)
+            if block:
+                self._buffer += self._compressor.compress(block)
+            else:
+                self._buffer += self._compressor.flush()
+                self._eof = True
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
@@ -1,21 +1,60 @@
+from __future__ import annotations
+
 import os
 import sys
-import psutil
-import gc
-import psycopg2
-from psycopg2.extras import execute_values
-import pandas as pd
-from typing import Type, List
-from dotenv import load_dotenv
-import boto3
-from io import BytesIO
+import csv
+import gzip
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Type, List, Dict, Optional, FrozenSet, TYPE_CHECKING
+from io import BytesIO, StringIO
 from datetime import datetime
-import numpy as np
+from data_models.settings import get_settings, get_s3_client
+
+# pandas, numpy, boto3 and psycopg2 are imported where they are used, so
+# importing the models (e.g. to route a header or print a schema) stays cheap
+# for short-lived CLI runs; see benchmarks/import_bench.py.
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Supported bulk insert paths for to_database. COPY streams a CSV rendering of
+# the chunk straight into Postgres; execute_values is kept as a fallback.
+WRITE_MODES = ("copy", "execute_values")
+# Raw trip files are plain CSV, or gzipped CSV when transcoded during ingestion
+CSV_SUFFIXES = (".csv", ".csv.gz")
+# Every raw row records the id of the transaction that loaded it. dbt models
+# read only batches above their last watermark and below the oldest
+# still-running transaction, so a load committing late is never skipped.
+LOAD_BATCH_COLUMN = "load_batch_id"
+LOAD_BATCH_SQL = f"{LOAD_BATCH_COLUMN} BIGINT DEFAULT txid_current()"
+
+def normalize_header(columns) -> List[str]:
+    """Strip whitespace, BOMs and stray quotes from header names (case is kept)."""
+    return [str(col).replace("\ufeff", "").strip().strip('"').strip() for col in columns]
 
 class BaseBikeShareRecord:
     staging_table: str = None
     s3_prefix: str = None
+    location: str = None
+    schema_version: str = None
+    # Field holding the trip start time, used to partition exported data
+    start_time_field: str = None
+    # Raw CSV column name -> dataclass field name, applied by to_dataframe
+    column_map: Dict[str, str] = {}
+    # Raw CSV columns a file must have to be routed to this model
+    required_columns: List[str] = []
+    # Low-cardinality string fields (stations, user types) parsed as pandas
+    # categoricals, so a chunk holds each distinct value once
+    categorical_columns: List[str] = []
+    # Field -> narrower pandas dtype than its annotation implies (e.g.
+    # float32 coordinates); the Postgres column type is unchanged
+    compact_dtypes: Dict[str, str] = {}
+    # Fields forming the natural row key, used to drop duplicate rows at ingest
+    row_key_columns: List[str] = []
     _registry: List[Type['BaseBikeShareRecord']] = []
+    # Header hash -> routed model (or None), shared by every lookup in the process
+    _route_cache: Dict[str, Optional[Type['BaseBikeShareRecord']]] = {}
 
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
@@ -23,35 +62,68 @@ class BaseBikeShareRecord:
             BaseBikeShareRecord._registry.append(cls)
 
     @classmethod
-    def list_s3_files(cls, prefix=None, year=None):
-        load_dotenv()
-        S3_BUCKET = os.environ["S3_BUCKET"]
-        s3 = boto3.client("s3")
+    def list_s3_files(cls, prefix=None, year=None, full_refresh=False):
+        """CSV keys under ``prefix``, optionally only those whose file name is dated ``year``.
+
+        Served from the local S3 inventory cache, which is re-listed at most
+        once per process (see data_models.inventory).
+        """
+        from data_models.inventory import get_inventory
+        bucket = get_settings().require_bucket()
         if prefix is None:
             prefix = cls.s3_prefix
-        paginator = s3.get_paginator("list_objects_v2")
-        files = []
-        for page in paginator.paginate(Bucket=S3_BUCKET, Prefix=prefix):
-            for obj in page.get("Contents", []):
-                key = obj["Key"]
-                if key.endswith(".csv"):
-                    if year is None or str(year) in key:
-                        files.append(key)
-        return files
+        inventory = get_inventory()
+        inventory.refresh(get_s3_client(), bucket, prefix, full=full_refresh)
+        return inventory.keys(bucket, prefix, year=year, suffixes=CSV_SUFFIXES)
 
     @classmethod
     def download_csv_from_s3(cls, s3_key):
-        load_dotenv()
-        S3_BUCKET = os.environ["S3_BUCKET"]
-        s3 = boto3.client("s3")
         csv_buffer = BytesIO()
-        s3.download_fileobj(S3_BUCKET, s3_key, csv_buffer)
+        get_s3_client().download_fileobj(get_settings().require_bucket(), s3_key, csv_buffer)
         csv_buffer.seek(0)
         return csv_buffer
 
+    @classmethod
+    def open_csv_stream_from_s3(cls, s3_key, prefetch=True, if_match=None, hasher=None):
+        """Open an S3 object as a streaming file object for the chunked CSV parser.
+
+        Unlike download_csv_from_s3, memory scales with the prefetch window
+        rather than the object size, and parsing starts with the first block.
+        ``hasher`` (e.g. ``hashlib.sha256()``) is fed the object's raw bytes
+        as they download.
+        """
+        from data_models.s3_stream import open_s3_stream
+        stream, _ = open_s3_stream(get_s3_client(), get_settings().require_bucket(), s3_key, prefetch=prefetch, if_match=if_match, hasher=hasher)
+        if s3_key.endswith(".gz"):
+            gz = gzip.GzipFile(fileobj=stream, mode="rb")
+            # GzipFile only closes a file object it opened itself (myfileobj);
+            # hand it the S3 stream so closing gz also stops the prefetcher.
+            gz.myfileobj = stream
+            return gz
+        return stream
+
+    @classmethod
+    def read_s3_header(cls, s3_key) -> List[str]:
+        """Read just the header row of an S3 CSV via a small ranged GET."""
+        from data_models.s3_stream import read_s3_first_line
+        line = read_s3_first_line(get_s3_client(), get_settings().require_bucket(), s3_key)
+        return next(csv.reader([line]), [])
+
+    @classmethod
+    def get_s3_etag(cls, s3_key):
+        return cls.head_s3_object(s3_key)["etag"]
+
+    @classmethod
+    def head_s3_object(cls, s3_key):
+        """ETag and size of an S3 object from a HEAD request."""
+        response = get_s3_client().head_object(Bucket=get_settings().require_bucket(), Key=s3_key)
+        return {"etag": response["ETag"].strip('"'), "size": response["ContentLength"]}
+
     @classmethod
     def _validate_type(cls, value, expected_type) -> bool:
         """Validate if a value matches the expected type, handling special cases."""
+        import numpy as np
+        import pandas as pd
         if expected_type == str:
             # For string fields, allow both strings and numbers (which will be converted)
             return isinstance(value, (str, int, float, np.integer))
@@ -73,122 +145,349 @@ class BaseBikeShareRecord:
 
     @classmethod
     def validate_schema(cls, df: pd.DataFrame) -> bool:
-        """Validate if the dataframe contains all required columns.
-        
-        This method should be implemented by subclasses to check if the dataframe
-        contains the expected columns. Type validation is handled during transformation.
+        """Validate if the dataframe contains all of the model's required_columns.
+
+        Type validation is handled during transformation.
         """
-        raise NotImplementedError("Subclasses must implement validate_schema")
+        return not cls.missing_columns(df.columns)
+
+    @classmethod
+    def missing_columns(cls, columns) -> List[str]:
+        present = set(normalize_header(columns))
+        return [col for col in cls.required_columns if col not in present]
+
+    @classmethod
+    def header_signature_index(cls) -> Dict[FrozenSet[str], Type['BaseBikeShareRecord']]:
+        """Normalized required-column set -> model, for every registered model."""
+        return {frozenset(normalize_header(m.required_columns)): m for m in cls._registry}
+
+    @classmethod
+    def route_header(cls, columns, s3_prefix) -> Optional[Type['BaseBikeShareRecord']]:
+        """Pick the model for a file from its header columns alone.
+
+        A model matches when all of its required columns are present; if
+        several match, the one with the most required columns (the most
+        specific signature) wins. Results are cached by a hash of the prefix
+        and header, so files sharing a header are routed once.
+        """
+        header = normalize_header(columns)
+        cache_key = hashlib.sha1("\x1f".join([s3_prefix or ""] + header).encode("utf-8")).hexdigest()
+        if cache_key in cls._route_cache:
+            return cls._route_cache[cache_key]
+        present = set(header)
+        candidates = set(cls.candidate_models(s3_prefix))
+        matches = [model for signature, model in cls.header_signature_index().items()
+                   if model in candidates and signature <= present]
+        model = max(matches, key=lambda m: len(m.required_columns)) if matches else None
+        cls._route_cache[cache_key] = model
+        return model
+
+    @classmethod
+    def route_s3_key(cls, s3_key, s3_prefix) -> Optional[Type['BaseBikeShareRecord']]:
+        """Route an S3 object to a model by reading only its first line."""
+        header = cls.read_s3_header(s3_key)
+        model = cls.route_header(header, s3_prefix)
+        if model is None:
+            cls._report_unrouted(os.path.basename(s3_key), header, s3_prefix)
+        return model
+
+    @classmethod
+    def classify_files(cls, s3_keys, s3_prefix, max_workers=16) -> Dict[str, Optional[Type['BaseBikeShareRecord']]]:
+        """Route many S3 objects concurrently; returns ``{s3_key: model or None}``."""
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            models = pool.map(lambda key: cls.route_s3_key(key, s3_prefix), s3_keys)
+            return dict(zip(s3_keys, models))
+
+    @classmethod
+    def _report_unrouted(cls, filename, columns, s3_prefix):
+        if not columns:
+            print(f"ERROR: {filename} is empty (no header row)")
+            return
+        for model in cls.candidate_models(s3_prefix):
+            missing = model.missing_columns(columns)
+            if missing:
+                print(f"For {model.__name__}, missing columns: {', '.join(missing)}")
+        print(f"ERROR: No model matched schema for {filename}")
 
     @classmethod
     def assign_model(cls, filename, s3_prefix, df_head=None):
-        """Assign a model based on schema validation rather than file name patterns."""
+        """Assign a model from the columns of an already parsed dataframe head."""
         if df_head is None:
             print(f"ERROR: Cannot assign model without dataframe head for {filename}")
             return None
-
-        # Filter models based on s3_prefix
-        prefix_to_location = {"london_csv/": "london", "nyc_csv/": "nyc"}
-        location = None
-        for prefix, loc in prefix_to_location.items():
-            if s3_prefix and s3_prefix.startswith(prefix):
-                location = loc
-                break
-        if not location:
+        if not cls.candidate_models(s3_prefix):
             print(f"No location found for s3_prefix: {s3_prefix}")
             return None
-
-        # Filter models by location
-        models = [m for m in cls._registry if m.s3_prefix.startswith(s3_prefix[:len(prefix)])]
-        
-        # Try each model's schema validation
-        for model in models:
-            try:
-                if model.validate_schema(df_head):
-                    print(f"Matched {filename} to {model.__name__}")
-                    return model
-            except Exception as e:
-                print(f"Schema validation failed for {model.__name__}: {str(e)}")
-                continue
-        # If no model matched, print missing columns for each model
-        for model in models:
-            required_columns = getattr(model, 'required_columns', None)
-            if required_columns is None:
-                # Try to get from validate_schema closure if possible
-                try:
-                    required_columns = model.validate_schema.__code__.co_consts[1]
-                except Exception:
-                    required_columns = []
-            missing_columns = [col for col in required_columns if col not in df_head.columns]
-            if missing_columns:
-                print(f"For {model.__name__}, missing columns: {', '.join(missing_columns)}")
-        print(f"ERROR: No model matched schema for {filename}")
-        return None
+        model = cls.route_header(list(df_head.columns), s3_prefix)
+        if model is None:
+            cls._report_unrouted(filename, df_head.columns, s3_prefix)
+            return None
+        print(f"Matched {filename} to {model.__name__}")
+        return model
 
     @classmethod
-    def load_from_s3(cls, prefix=None, year=None, dry_run=False, filename=None, chunksize=10000):
-        files = cls.list_s3_files(prefix=prefix, year=year)
+    def load_from_s3(cls, prefix=None, year=None, dry_run=False, filename=None, chunksize=10000,
+                     write_mode="copy", commit_rows=None, workers=1, keys=None, engine="c", memory_budget=None,
+                     dedup=True):
+        """Load every matching file and return a summary of the run.
+
+        ``commit_rows=None`` commits once per file; otherwise a commit is issued
+        every ``commit_rows`` rows. A failing file is rolled back and skipped.
+        With ``workers > 1`` files are fanned out to a process pool, each worker
+        holding its own LoaderSession. ``keys`` skips the S3 listing and loads
+        exactly those objects.
+
+        ``memory_budget`` (bytes, shared by all workers) switches from a fixed
+        ``chunksize`` to adaptive chunk sizes; see data_models.chunking.
+        ``dedup`` drops byte-identical files and rows whose natural key was
+        already loaded; see data_models.dedup.
+        """
+        from data_models.loader import LoaderSession, load_files_parallel, summarize_results
+        files = keys if keys is not None else cls.list_s3_files(prefix=prefix, year=year)
         if filename:
             files = [f for f in files if os.path.basename(f) == filename]
         print(f"Found {len(files)} files in S3 prefix '{prefix}'")
-        for s3_key in files:
-            filename = os.path.basename(s3_key)
-            print(f"\nProcessing {s3_key}")
-            csv_buffer = cls.download_csv_from_s3(s3_key)
-            chunk_iter = pd.read_csv(csv_buffer, chunksize=chunksize)
-            total_rows = 0
-            chunk_num = 0
-            model = None
-            for chunk in chunk_iter:
+        if memory_budget:
+            memory_budget = memory_budget // max(workers, 1)
+            print(f"Adaptive chunk sizing: {memory_budget / 1024 ** 2:.0f} MB budget per loader process")
+        if workers > 1:
+            return load_files_parallel(files, prefix, workers=workers, dry_run=dry_run, chunksize=chunksize,
+                                       write_mode=write_mode, commit_rows=commit_rows, engine=engine,
+                                       memory_budget=memory_budget, dedup=dedup)
+        start = time.perf_counter()
+        results = []
+        with LoaderSession(write_mode=write_mode, commit_rows=commit_rows) as session:
+            for s3_key in files:
+                results.append(cls.load_file(s3_key, prefix, session, dry_run=dry_run, chunksize=chunksize,
+                                             engine=engine, memory_budget=memory_budget, dedup=dedup))
+            if not dry_run:
+                print(session.summary())
+        return summarize_results(results, time.perf_counter() - start)
+
+    @classmethod
+    def load_file(cls, s3_key, prefix, session, dry_run=False, chunksize=10000, engine="c", memory_budget=None,
+                  dedup=True):
+        """Load a single S3 object through ``session`` and return a per-file result.
+
+        Progress is tracked in the load ledger: a file already loaded at its
+        current ETag is skipped, and a partially loaded one resumes after its
+        last committed row. Any error rolls back the session's open
+        transaction and is recorded in the result instead of raised, so one bad
+        file does not stop a batch.
+        """
+        from data_models.ledger import LoadLedger
+        from data_models.csv_reader import read_csv_chunks
+        from data_models.metrics import FileMetrics, get_sink
+        from data_models.chunking import ChunkSizer
+        from data_models.dedup import RowKeyIndex
+        from data_models.s3_stream import prefetching_reader
+        filename = os.path.basename(s3_key)
+        print(f"\nProcessing {s3_key}")
+        start = time.perf_counter()
+        result = {"s3_key": s3_key, "rows": 0, "seconds": 0.0, "error": None, "skipped": False, "duplicates": 0}
+        metrics = FileMetrics(get_sink(), s3_key)
+        chunk_num = 0
+        csv_stream = None
+        etag = None
+        hasher = None
+        try:
+            skip_rows = 0
+            if not dry_run:
+                head = cls.head_s3_object(s3_key)
+                etag = head["etag"]
+                state = LoadLedger.begin(session.connection(), s3_key, etag, chunksize, size_bytes=head["size"])
+                if state["status"] == LoadLedger.STATUS_COMPLETE:
+                    print(f"Skipping {filename}: already loaded ({state['rows_loaded']} rows, etag {etag})")
+                    result["skipped"] = True
+                    return result
+                if dedup:
+                    original = LoadLedger.find_identical(session.connection(), s3_key, etag, head["size"])
+                    if original is not None:
+                        print(f"Skipping {filename}: byte-identical to already loaded {original}")
+                        LoadLedger.mark_complete(session.connection(), s3_key, etag, duplicate_of=original)
+                        session.commit()
+                        result["skipped"] = True
+                        return result
+                    hasher = hashlib.sha256()
+                progress = {"table": None, "rows": state["rows_loaded"], "chunks": state["chunks_committed"]}
+                if progress["rows"]:
+                    print(f"Resuming {filename} after {progress['rows']} committed rows")
+                    skip_rows = progress["rows"]
+                chunk_num = progress["chunks"]
+                session.before_commit = lambda conn: LoadLedger.record_progress(
+                    conn, s3_key, etag, progress["table"], progress["rows"], progress["chunks"],
+                    time.perf_counter() - start)
+            model = cls.route_s3_key(s3_key, prefix)
+            if model is None:
+                raise ValueError(f"No model matched file {filename}")
+            print(f"Matched {filename} to {model.__name__}")
+            metrics.model = model.__name__
+            with metrics.stage("download"):
+                csv_stream = cls.open_csv_stream_from_s3(s3_key, if_match=etag, hasher=hasher)
+            metrics.reader = prefetching_reader(csv_stream)
+            sizer = ChunkSizer(memory_budget, initial_rows=chunksize) if memory_budget else None
+            chunk_iter = read_csv_chunks(csv_stream, chunksize=chunksize, engine=engine,
+                                         dtypes=model.get_csv_dtypes(), skip_rows=skip_rows, sizer=sizer)
+            while True:
+                with metrics.stage("parse"):
+                    chunk = next(chunk_iter, None)
+                if chunk is None:
+                    break
                 chunk_num += 1
-                if model is None:
-                    model = cls.assign_model(filename, prefix, chunk.head())
-                    if model is None:
-                        print(f"ERROR: No model matched file {filename} (chunk {chunk_num})")
-                        break
-                df_aligned = model.to_dataframe(chunk, filename)
-                total_rows += len(df_aligned)
+                chunk.columns = normalize_header(chunk.columns)
+                with metrics.stage("transform"):
+                    df_aligned = model.to_dataframe(chunk, filename)
+                if sizer is not None:
+                    sizer.observe(chunk)
+                source_rows = len(df_aligned)
                 if dry_run:
                     print(f"[DRY RUN] Chunk {chunk_num}: Would insert {len(df_aligned)} rows into {model.staging_table}")
                 else:
-                    model.to_database(df_aligned)
-                    print(f"Inserted chunk {chunk_num}: {len(df_aligned)} rows into {model.staging_table}")
-                # Log memory usage
-                process = psutil.Process(os.getpid())
-                mem_mb = process.memory_info().rss / 1024 / 1024
-                print(f"[Memory] After chunk {chunk_num}: {mem_mb:.2f} MB used")
-                # Explicitly delete DataFrames and run garbage collection
-                del chunk
-                del df_aligned
-                gc.collect()
-            print(f"Finished {filename}: {total_rows} rows processed.")
-
-    @classmethod
-    def to_database(cls, df: pd.DataFrame):
-        load_dotenv()
-        DB_HOST = os.environ.get("DB_HOST")
-        DB_USER = os.environ.get("DB_USER")
-        DB_PASSWORD = os.environ.get("DB_PASSWORD")
-        DB_NAME = os.environ.get("DB_NAME")
-        DB_PORT = os.environ.get("DB_PORT", 5432)
+                    progress["table"] = model.staging_table
+                    # Offsets count source rows, so a resume skips dropped duplicates too
+                    progress["rows"] += source_rows
+                    progress["chunks"] = chunk_num
+                    with metrics.stage("write"):
+                        if dedup:
+                            df_aligned, duplicates = RowKeyIndex.filter_new(session.connection(), model, df_aligned)
+                            result["duplicates"] += duplicates
+                        if len(df_aligned):
+                            session.write(model, df_aligned)
+                    print(f"Inserted chunk {chunk_num}: {len(df_aligned)} rows into {model.staging_table}"
+                          + (f" ({duplicates} duplicates dropped)" if dedup and duplicates else ""))
+                result["rows"] += len(df_aligned)
+                metrics.chunk_done(source_rows)
+                # Drop references before the next chunk is parsed; the
+                # generational GC reclaims them without a forced collection.
+                del chunk, df_aligned
+            if not dry_run:
+                content_sha256 = hasher.hexdigest() if hasher is not None else None
+                if content_sha256 and not skip_rows:
+                    original = LoadLedger.find_by_content(session.connection(), s3_key, content_sha256)
+                    if original is not None:
+                        print(f"Note: {filename} has the same contents as {original}; its rows were dropped as duplicates")
+                LoadLedger.mark_complete(session.connection(), s3_key, etag, content_sha256=content_sha256,
+                                         rows_duplicate=result["duplicates"])
+                session.end_file()
+        except Exception as e:
+            print(f"ERROR: Failed to load {s3_key} at chunk {chunk_num}: {e}")
+            session.rollback()
+            result["rows"] = 0
+            result["error"] = str(e)
+            if etag is not None:
+                try:
+                    LoadLedger.mark_failed(session.connection(), s3_key, etag, str(e))
+                except Exception as ledger_error:
+                    print(f"ERROR: Could not record failure in ledger for {s3_key}: {ledger_error}")
+        finally:
+            session.before_commit = None
+            if csv_stream is not None:
+                csv_stream.close()
+            result["seconds"] = time.perf_counter() - start
+            metrics.finish(error=result["error"], skipped=result["skipped"])
+        if result["error"] is None:
+            print(f"Finished {filename}: {result['rows']} rows processed.")
+            if not result["skipped"]:
+                print(metrics.summary_line())
+        return result
+
+    @classmethod
+    def _copy_buffer(cls, df: pd.DataFrame, cols: List[str]):
+        """Render a chunk as CSV for COPY ... FROM STDIN.
+
+        Integer fields that pandas widened to float (because of missing values)
+        are rounded back to nullable integers, otherwise Postgres rejects
+        values like '1990.0' for BIGINT columns. Missing values become empty
+        unquoted fields, which COPY reads as NULL.
+
+        When pyarrow is available the CSV is written by Arrow's writer, which
+        formats categorical (dictionary) columns from their dictionary and
+        codes instead of expanding them to per-row Python strings as
+        ``DataFrame.to_csv`` does; otherwise pandas writes it.
+        """
+        import pandas as pd
+        sql_types = cls._sql_types()
+        widened = [col for col in cols
+                   if sql_types[col] == "BIGINT" and pd.api.types.is_float_dtype(df[col])]
+        out = df[cols].copy() if widened else df[cols]
+        for col in widened:
+            out[col] = out[col].round().astype("Int64")
+        try:
+            import pyarrow as pa
+            from pyarrow import csv as pa_csv
+        except ImportError:
+            pa = None
+        if pa is not None:
+            try:
+                table = pa.Table.from_pandas(out, preserve_index=False)
+                buffer = BytesIO()
+                pa_csv.write_csv(table, buffer, write_options=pa_csv.WriteOptions(include_header=False))
+                buffer.seek(0)
+                return buffer
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+                pass
+        buffer = StringIO()
+        out.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        return buffer
+
+    @classmethod
+    def _connect(cls):
+        """Open a new database connection from the DB_* environment variables."""
+        import psycopg2
+        return psycopg2.connect(**get_settings().db_params())
+
+    @classmethod
+    def to_database(cls, df: pd.DataFrame, mode="copy", conn=None) -> float:
+        """Insert a chunk into the staging table and return the seconds spent writing.
+
+        When ``conn`` is given the rows are written inside the caller's open
+        transaction and nothing is committed; otherwise a short-lived
+        connection is opened and committed for this chunk alone.
+        """
+        if mode not in WRITE_MODES:
+            raise ValueError(f"Unknown write mode {mode!r}, expected one of {WRITE_MODES}")
+        if conn is None:
+            conn = cls._connect()
+            try:
+                elapsed = cls.to_database(df, mode=mode, conn=conn)
+                conn.commit()
+            finally:
+                conn.close()
+            return elapsed
         cols = list(cls.__dataclass_fields__.keys())
-        with psycopg2.connect(
-            host=DB_HOST,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            dbname=DB_NAME,
-            port=DB_PORT
-        ) as conn:
-            with conn.cursor() as cur:
+        start = time.perf_counter()
+        with conn.cursor() as cur:
+            if mode == "copy":
+                cur.copy_expert(
+                    f"COPY {cls.staging_table} ({', '.join(cols)}) FROM STDIN WITH (FORMAT csv)",
+                    cls._copy_buffer(df, cols)
+                )
+            else:
+                from psycopg2.extras import execute_values
                 execute_values(
                     cur,
                     f"INSERT INTO {cls.staging_table} ({', '.join(cols)}) VALUES %s",
                     df[cols].values.tolist()
                 )
-            conn.commit()
+        elapsed = time.perf_counter() - start
+        rate = len(df) / elapsed if elapsed > 0 else float("inf")
+        print(f"[{mode}] {len(df)} rows in {elapsed:.3f}s ({rate:,.0f} rows/sec)")
+        return elapsed
 
     @classmethod
-    def get_schema_sql(cls) -> str:
+    def _field_type_names(cls) -> Dict[str, str]:
+        """Map each dataclass field to a normalized type name, e.g. 'str' or 'Optional[int]'."""
+        names = {}
+        for field, fdef in cls.__dataclass_fields__.items():
+            t = str(fdef.type)
+            t = t.replace("<class '","").replace("'>","").replace("typing.","")
+            names[field] = t.replace("datetime.datetime", "datetime")
+        return names
+
+    @classmethod
+    def _sql_types(cls) -> dict:
+        """Map each dataclass field to its Postgres column type."""
         type_map = {
             "str": "TEXT",
             "int": "BIGINT",
@@ -197,15 +496,63 @@ class BaseBikeShareRecord:
             "Optional[float]": "FLOAT",
             "datetime": "TIMESTAMP"
         }
+        return {field: type_map.get(t, "TEXT") for field, t in cls._field_type_names().items()}
+
+    @classmethod
+    def get_csv_dtypes(cls) -> Dict[str, str]:
+        """Map raw CSV column names to the pandas dtype of the field they feed.
+
+        Passing this to the CSV parser disables per-chunk type inference, so
+        e.g. station IDs are always strings instead of flipping between int
+        and str across chunks. Integers use the nullable Int64 dtype; anything
+        parsed later in to_dataframe (timestamps) is read as a string.
+        """
+        dtype_map = {
+            "str": "str",
+            "int": "Int64",
+            "Optional[int]": "Int64",
+            "float": "float64",
+            "Optional[float]": "float64",
+        }
+        field_types = cls._field_type_names()
+        dtypes = {}
+        for raw, field in cls.column_map.items():
+            if field not in field_types:
+                continue
+            if field in cls.categorical_columns:
+                dtypes[raw] = "category"
+            else:
+                dtypes[raw] = cls.compact_dtypes.get(field, dtype_map.get(field_types[field], "str"))
+        return dtypes
+
+    @staticmethod
+    def constant_column(value, index) -> pd.Series:
+        """A single-category column repeating ``value``: one string plus a byte per row."""
+        import numpy as np
+        import pandas as pd
+        codes = np.zeros(len(index), dtype=np.int8)
+        return pd.Series(pd.Categorical.from_codes(codes, categories=[value]), index=index)
+
+    @classmethod
+    def candidate_models(cls, s3_prefix) -> List[Type['BaseBikeShareRecord']]:
+        """Registered models whose S3 prefix matches ``s3_prefix``."""
+        return [m for m in cls._registry if s3_prefix and m.s3_prefix and s3_prefix.startswith(m.s3_prefix)]
+
+    @classmethod
+    def get_schema_sql(cls) -> str:
         lines = [f"CREATE TABLE IF NOT EXISTS {cls.staging_table} ("]
-        for field, fdef in cls.__dataclass_fields__.items():
-            t = str(fdef.type)
-            t = t.replace("<class '","").replace("'>","").replace("typing.","")
-            sql_type = type_map.get(t, "TEXT")
+        for field, sql_type in cls._sql_types().items():
             lines.append(f"    {field} {sql_type},")
-        lines.append("    ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP\n);")
+        lines.append("    ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,")
+        lines.append(f"    {LOAD_BATCH_SQL}\n);")
+        lines.append(cls.load_batch_index_sql())
         return "\n".join(lines)
 
+    @classmethod
+    def load_batch_index_sql(cls) -> str:
+        return (f"CREATE INDEX IF NOT EXISTS {cls.staging_table}_{LOAD_BATCH_COLUMN}_idx "
+                f"ON {cls.staging_table} ({LOAD_BATCH_COLUMN});")
+
     @classmethod
     def to_dataframe(cls, df: pd.DataFrame, source_file: str) -> pd.DataFrame:
         """Transform raw dataframe into standardized model format.
@@ -221,27 +568,64 @@ class BaseBikeShareRecord:
     @classmethod
     def create_table(cls):
         """Executes the DDL statement for this model's table in the database."""
-        load_dotenv()
-        DB_HOST = os.environ.get("DB_HOST")
-        DB_USER = os.environ.get("DB_USER")
-        DB_PASSWORD = os.environ.get("DB_PASSWORD")
-        DB_NAME = os.environ.get("DB_NAME")
-        DB_PORT = os.environ.get("DB_PORT", 5432)
         ddl = cls.get_schema_sql()
-        with psycopg2.connect(
-            host=DB_HOST,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            dbname=DB_NAME,
-            port=DB_PORT
-        ) as conn:
+        conn = cls._connect()
+        try:
             with conn.cursor() as cur:
                 cur.execute(ddl)
             conn.commit()
+        finally:
+            conn.close()
         print(f"Created table (if not exists): {cls.staging_table}")
 
+    @classmethod
+    def migrate_table(cls):
+        """Bring an existing staging table in line with the model.
+
+        Adds columns the table is missing and converts TEXT columns the model
+        now declares as TIMESTAMP, so tables created before a model change do
+        not need to be dropped and reloaded.
+        """
+        conn = cls._connect()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = %s",
+                    (cls.staging_table,)
+                )
+                existing = dict(cur.fetchall())
+                if not existing:
+                    print(f"Table {cls.staging_table} does not exist; run create_table first")
+                    return
+                for field, sql_type in cls._sql_types().items():
+                    if field not in existing:
+                        print(f"Adding {cls.staging_table}.{field} {sql_type}")
+                        cur.execute(f"ALTER TABLE {cls.staging_table} ADD COLUMN {field} {sql_type}")
+                    elif sql_type == "TIMESTAMP" and existing[field] == "text":
+                        print(f"Converting {cls.staging_table}.{field} from TEXT to TIMESTAMP")
+                        cur.execute(
+                            f"ALTER TABLE {cls.staging_table} ALTER COLUMN {field} TYPE TIMESTAMP USING {field}::timestamp"
+                        )
+                if LOAD_BATCH_COLUMN not in existing:
+                    # Added without a default first, so existing rows stay NULL
+                    # (already processed) instead of all sharing this batch id
+                    print(f"Adding {cls.staging_table}.{LOAD_BATCH_COLUMN}")
+                    cur.execute(f"ALTER TABLE {cls.staging_table} ADD COLUMN {LOAD_BATCH_COLUMN} BIGINT")
+                    cur.execute(f"ALTER TABLE {cls.staging_table} ALTER COLUMN {LOAD_BATCH_COLUMN} "
+                                f"SET DEFAULT txid_current()")
+                cur.execute(cls.load_batch_index_sql())
+            conn.commit()
+        finally:
+            conn.close()
+
     @classmethod
     def create_all_tables(cls):
         """Executes the DDL for all registered models."""
         for model in cls._registry:
-            model.create_table() 
\ No newline at end of file
+            model.create_table()
+
+    @classmethod
+    def migrate_all_tables(cls):
+        """Runs migrate_table for all registered models."""
+        for model in cls._registry:
+            model.migrate_table() 
\ No newline at end of file
@@ -0,0 +1,85 @@
+import re
+
+# A parsed chunk is alive alongside its to_dataframe output and the COPY
+# buffer rendered from it, so peak memory per chunk is a few times the
+# parsed frame itself.
+PEAK_FACTOR = 4
+MIN_CHUNK_ROWS = 1000
+MAX_CHUNK_ROWS = 2_000_000
+# Chunk sizes grow by at most this factor per chunk, but shrink at once.
+MAX_GROWTH = 2.0
+
+_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(value):
+    """Parse a byte size like ``8G``, ``512M``, ``1.5GB`` or ``1048576`` into bytes."""
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMGT]?)i?B?\s*", str(value), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid size {value!r}, expected e.g. 8G, 512M or a byte count")
+    return int(float(match.group(1)) * _UNITS[match.group(2).upper()])
+
+
+def _rss():
+    import psutil
+    return psutil.Process().memory_info().rss
+
+
+class ChunkSizer:
+    """Picks CSV chunk sizes that keep a loader process under ``memory_budget`` bytes.
+
+    The first chunk is read at ``initial_rows``; its deep memory usage gives a
+    bytes-per-row estimate, and later chunks are sized so that
+    ``PEAK_FACTOR * rows * bytes_per_row`` fits in the budget left above the
+    process's RSS when loading started, as large as that allows (fewer DB
+    round trips). The estimate is re-measured every ``remeasure_every``
+    chunks and RSS is checked after every chunk: a wider chunk (e.g. long
+    station names) or RSS over budget shrinks the next chunk immediately,
+    while narrower chunks only grow it gradually.
+    """
+
+    def __init__(self, memory_budget, initial_rows=10000, min_rows=MIN_CHUNK_ROWS, max_rows=MAX_CHUNK_ROWS,
+                 peak_factor=PEAK_FACTOR, remeasure_every=8):
+        self.memory_budget = memory_budget
+        self.min_rows = min_rows
+        self.max_rows = max_rows
+        self.peak_factor = peak_factor
+        self.remeasure_every = remeasure_every
+        self.baseline_rss = _rss()
+        # Leave at least a tenth of the budget for chunks even if the process
+        # is already large when it starts.
+        self.headroom = max(memory_budget - self.baseline_rss, memory_budget // 10)
+        self.bytes_per_row = None
+        self.size = max(min(initial_rows, max_rows), min_rows)
+        self.chunks = 0
+
+    def next_size(self):
+        return self.size
+
+    def observe(self, chunk):
+        """Update the estimate from a parsed chunk and pick the next chunk size."""
+        self.chunks += 1
+        rows = len(chunk)
+        if rows and (self.bytes_per_row is None or self.chunks % self.remeasure_every == 0):
+            measured = chunk.memory_usage(index=False, deep=True).sum() / rows
+            if self.bytes_per_row is None or measured > self.bytes_per_row:
+                self.bytes_per_row = measured
+            else:
+                # Narrower rows: decay toward them slowly
+                self.bytes_per_row = 0.7 * self.bytes_per_row + 0.3 * measured
+        rss = _rss()
+        if rss > self.memory_budget and self.bytes_per_row:
+            # Over budget regardless of the estimate (fragmentation, other
+            # allocations): treat rows as proportionally wider.
+            self.bytes_per_row *= rss / self.memory_budget
+        if not self.bytes_per_row:
+            return self.size
+        target = int(self.headroom / (self.peak_factor * self.bytes_per_row))
+        target = min(target, int(self.size * MAX_GROWTH))
+        new_size = max(self.min_rows, min(self.max_rows, target))
+        if new_size != self.size and (new_size < self.size or new_size > self.size * 1.25):
+            print(f"[Chunking] {self.size} -> {new_size} rows/chunk "
+                  f"({self.bytes_per_row:.0f} B/row, RSS {rss / 1024 ** 2:.0f} MB of "
+                  f"{self.memory_budget / 1024 ** 2:.0f} MB budget)")
+            self.size = new_size
+        return self.size
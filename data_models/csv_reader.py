@@ -0,0 +1,82 @@
+import pandas as pd
+
+CSV_ENGINES = ("c", "pyarrow")
+
+# pyarrow's streaming reader works in byte blocks rather than rows; this
+# rough bytes-per-row figure turns the loader's chunksize into a block size.
+ARROW_BYTES_PER_ROW = 200
+
+
+def read_csv_chunks(stream, chunksize=10000, engine="c", dtypes=None, skip_rows=0, sizer=None):
+    """Yield DataFrame chunks from a CSV file object.
+
+    ``dtypes`` maps raw CSV column names to pandas dtypes (see
+    BaseBikeShareRecord.get_csv_dtypes); columns it names are never type
+    inferred, so a column keeps the same dtype in every chunk. ``skip_rows``
+    skips that many data rows after the header (used to resume a load).
+
+    ``engine="c"`` uses pandas' chunked C parser. ``engine="pyarrow"`` uses
+    ``pyarrow.csv.open_csv``, which parses each block on multiple threads and
+    yields chunks of roughly ``chunksize`` rows.
+
+    With a ``sizer`` (see data_models.chunking.ChunkSizer) each chunk is
+    ``sizer.next_size()`` rows instead, asked for just before it is read.
+    """
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"Unknown CSV engine {engine!r}, expected one of {CSV_ENGINES}")
+    if engine == "pyarrow":
+        yield from _read_arrow_chunks(stream, chunksize, dtypes or {}, skip_rows, sizer)
+        return
+    skiprows = (lambda i: 0 < i <= skip_rows) if skip_rows else None
+    if sizer is None:
+        yield from pd.read_csv(stream, chunksize=chunksize, dtype=dtypes, skiprows=skiprows)
+        return
+    with pd.read_csv(stream, iterator=True, dtype=dtypes, skiprows=skiprows) as reader:
+        while True:
+            try:
+                yield reader.get_chunk(sizer.next_size())
+            except StopIteration:
+                return
+
+
+def _read_arrow_chunks(stream, chunksize, dtypes, skip_rows, sizer=None):
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+    except ImportError as e:
+        raise ImportError("engine='pyarrow' requires the pyarrow package") from e
+    arrow_types = {"str": pa.string(), "Int64": pa.int64(), "Int32": pa.int32(), "Int16": pa.int16(),
+                   "Int8": pa.int8(), "float64": pa.float64(), "float32": pa.float32(),
+                   # Dictionary-encoded while parsing; converts to a pandas categorical
+                   "category": pa.dictionary(pa.int32(), pa.string())}
+    column_types = {col: arrow_types[dtype] for col, dtype in dtypes.items() if dtype in arrow_types}
+    reader = pa_csv.open_csv(
+        stream,
+        read_options=pa_csv.ReadOptions(
+            block_size=max(1 << 20, chunksize * ARROW_BYTES_PER_ROW),
+            skip_rows_after_names=skip_rows,
+            use_threads=True,
+        ),
+        convert_options=pa_csv.ConvertOptions(column_types=column_types, strings_can_be_null=True),
+    )
+    # Keep nullable integers as Int64/Int32/... instead of letting them widen to float64.
+    types_mapper = {pa.int64(): pd.Int64Dtype(), pa.int32(): pd.Int32Dtype(), pa.int16(): pd.Int16Dtype(),
+                    pa.int8(): pd.Int8Dtype()}.get
+    if sizer is None:
+        for batch in reader:
+            yield batch.to_pandas(types_mapper=types_mapper)
+        return
+    # Arrow's block size is fixed once the reader is open, so re-cut its
+    # batches into chunks of the sizer's current size.
+    pending, pending_rows = [], 0
+    for batch in reader:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        while pending_rows and pending_rows >= sizer.next_size():
+            size = sizer.next_size()
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, size).to_pandas(types_mapper=types_mapper)
+            rest = table.slice(size)
+            pending, pending_rows = rest.to_batches(), rest.num_rows
+    if pending_rows:
+        yield pa.Table.from_batches(pending).to_pandas(types_mapper=types_mapper)
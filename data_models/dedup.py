@@ -0,0 +1,118 @@
+from io import StringIO
+import numpy as np
+import pandas as pd
+from data_models.base import BaseBikeShareRecord
+
+
+class RowKeyIndex:
+    """Indexed table of natural-key hashes for each raw table.
+
+    Every model names its natural row key in ``row_key_columns``; each row's
+    key columns are hashed to one signed 64-bit integer and stored in
+    ``<staging_table>_row_keys``. Before a chunk is written its hashes are
+    inserted there with ``ON CONFLICT DO NOTHING RETURNING``, and only rows
+    whose hash came back (i.e. was new) are written. The key inserts run in
+    the loader's open transaction, so a rollback forgets them along with the
+    rows.
+
+    A 64-bit hash means a false "duplicate" needs a collision: roughly a
+    one-in-a-thousand chance of a single dropped row across 2e8 rows.
+    """
+
+    @classmethod
+    def table(cls, model) -> str:
+        return f"{model.staging_table}_row_keys"
+
+    @classmethod
+    def get_schema_sql(cls, model) -> str:
+        return f"""CREATE TABLE IF NOT EXISTS {cls.table(model)} (
+    key_hash BIGINT PRIMARY KEY
+);"""
+
+    @classmethod
+    def create_tables(cls):
+        conn = BaseBikeShareRecord._connect()
+        try:
+            with conn.cursor() as cur:
+                for model in BaseBikeShareRecord._registry:
+                    if model.row_key_columns:
+                        cur.execute(cls.get_schema_sql(model))
+                        print(f"Created table (if not exists): {cls.table(model)}")
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def row_hashes(model, df: pd.DataFrame) -> np.ndarray:
+        """Signed 64-bit hash of each row's natural key.
+
+        Strings hash by value whether stored as object or categorical, so
+        hashes are stable across chunks and runs. Missing values (NaN from a
+        CSV, None from a SQL NULL in ``backfill``) all hash as "".
+        """
+        keys = df[model.row_key_columns]
+        keys = keys.astype(object).where(keys.notna(), "").astype(str)
+        return pd.util.hash_pandas_object(keys, index=False).to_numpy().view(np.int64)
+
+    @classmethod
+    def _insert_hashes(cls, cur, model, hashes, returning=False):
+        """COPY ``hashes`` into a temp table and merge them into the key table.
+
+        With ``returning`` the hashes that were not already present are returned.
+        Rows are inserted in key order, so concurrent loads of overlapping
+        files take the primary key's row locks in the same order and cannot
+        deadlock on each other.
+        """
+        cur.execute("CREATE TEMP TABLE IF NOT EXISTS incoming_row_keys (key_hash BIGINT) ON COMMIT DELETE ROWS")
+        cur.execute("TRUNCATE incoming_row_keys")
+        cur.copy_expert("COPY incoming_row_keys (key_hash) FROM STDIN",
+                        StringIO("\n".join(map(str, hashes.tolist())) + "\n"))
+        cur.execute(
+            f"""INSERT INTO {cls.table(model)} (key_hash)
+                SELECT key_hash FROM incoming_row_keys ORDER BY key_hash
+                ON CONFLICT (key_hash) DO NOTHING"""
+            + (" RETURNING key_hash" if returning else "")
+        )
+        if returning:
+            return np.fromiter((row[0] for row in cur), dtype=np.int64)
+        return None
+
+    @classmethod
+    def filter_new(cls, conn, model, df: pd.DataFrame):
+        """Return ``(new_rows, duplicates)``, recording the new keys in the key table.
+
+        Rows repeated within ``df`` and rows whose key is already in the
+        table are both dropped.
+        """
+        if not model.row_key_columns or df.empty:
+            return df, 0
+        hashes = cls.row_hashes(model, df)
+        first = ~pd.Series(hashes).duplicated().to_numpy()
+        with conn.cursor() as cur:
+            inserted = cls._insert_hashes(cur, model, hashes[first], returning=True)
+        keep = first & np.isin(hashes, inserted)
+        duplicates = int(len(df) - keep.sum())
+        return (df[keep] if duplicates else df), duplicates
+
+    @classmethod
+    def backfill(cls, model, batch_rows=500_000):
+        """Seed the key table from rows already in the raw table; returns rows hashed."""
+        conn = BaseBikeShareRecord._connect()
+        total = 0
+        try:
+            # Server-side cursor, so the raw table is streamed rather than fetched whole
+            with conn.cursor(name=f"backfill_{model.staging_table}") as source, conn.cursor() as cur:
+                source.itersize = batch_rows
+                source.execute(f"SELECT {', '.join(model.row_key_columns)} FROM {model.staging_table}")
+                while True:
+                    rows = source.fetchmany(batch_rows)
+                    if not rows:
+                        break
+                    df = pd.DataFrame(rows, columns=model.row_key_columns)
+                    cls._insert_hashes(cur, model, np.unique(cls.row_hashes(model, df)))
+                    total += len(rows)
+                    print(f"[Backfill] {model.staging_table}: {total} rows hashed")
+            conn.commit()
+        finally:
+            conn.close()
+        return total
@@ -0,0 +1,162 @@
+import os
+import re
+import time
+import sqlite3
+from datetime import datetime
+
+DEFAULT_INVENTORY_PATH = os.path.expanduser("~/.cache/city_cycles/s3_inventory.sqlite")
+
+MONTHS = {m: i for i, m in enumerate(["jan", "feb", "mar", "apr", "may", "jun",
+                                      "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+# NYC: 202302-citibike-tripdata_1.csv, 2019-citibike-tripdata.zip
+NYC_NAME = re.compile(r"^(\d{4})(\d{2})?[-_]")
+# London: 390JourneyDataExtract04Jan2024-10Jan2024.csv, 01aJourneyDataExtract10Jan16-23Jan16.csv
+LONDON_NAME = re.compile(r"Extract\s?(\d{1,2})([A-Za-z]{3})[A-Za-z]*(\d{4}|\d{2})", re.IGNORECASE)
+
+
+def parse_year_month(key):
+    """(year, month) a trip file covers, parsed from its file name; None where unknown.
+
+    London weekly extracts are dated by their first day.
+    """
+    name = os.path.basename(key)
+    match = NYC_NAME.match(name)
+    if match:
+        return int(match.group(1)), int(match.group(2)) if match.group(2) else None
+    match = LONDON_NAME.search(name)
+    if match and match.group(2).lower() in MONTHS:
+        year = int(match.group(3))
+        return (year + 2000 if year < 100 else year), MONTHS[match.group(2).lower()]
+    return None, None
+
+
+class S3Inventory:
+    """SQLite cache of S3 listings: key, size, ETag, last-modified and parsed year/month.
+
+    ``refresh`` lists a bucket/prefix at most once per process, so loaders
+    query the cache instead of paginating the whole bucket on every call.
+    Each refresh is a full listing upserted into the cache: key names do not
+    sort by date in these buckets (``JC-...`` after ``2026...``, London's
+    ``1000...`` before ``390...``), so a ``StartAfter`` watermark would miss
+    new keys, and it would never see objects replaced under an existing key.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("S3_INVENTORY_PATH", DEFAULT_INVENTORY_PATH)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self._refreshed = set()
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS objects (
+                    bucket TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    size INTEGER,
+                    etag TEXT,
+                    last_modified TEXT,
+                    year INTEGER,
+                    month INTEGER,
+                    PRIMARY KEY (bucket, key)
+                )""")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS refreshes (
+                    bucket TEXT NOT NULL,
+                    prefix TEXT NOT NULL,
+                    refreshed_at REAL,
+                    full_refreshed_at REAL,
+                    PRIMARY KEY (bucket, prefix)
+                )""")
+
+    @staticmethod
+    def _prefix_range(prefix):
+        # key >= prefix AND key < upper bound is an index range scan, unlike LIKE
+        return prefix, prefix + "\uffff"
+
+    def refresh(self, client, bucket, prefix="", full=False, force=False):
+        """Bring the cache for ``bucket``/``prefix`` up to date; returns keys added or changed.
+
+        ``full`` / ``force`` list again even if this process already did.
+        """
+        if (bucket, prefix) in self._refreshed and not (full or force):
+            return 0
+        low, high = self._prefix_range(prefix)
+        start = time.perf_counter()
+        seen = []
+        paginator = client.get_paginator("list_objects_v2")
+        changes = self.conn.total_changes
+        with self.conn:
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+                rows = []
+                for obj in page.get("Contents", []):
+                    year, month = parse_year_month(obj["Key"])
+                    modified = obj.get("LastModified")
+                    rows.append((bucket, obj["Key"], obj.get("Size"), obj.get("ETag", "").strip('"') or None,
+                                 modified.isoformat() if isinstance(modified, datetime) else modified,
+                                 year, month))
+                seen.extend(row[1] for row in rows)
+                self.conn.executemany("""
+                    INSERT INTO objects (bucket, key, size, etag, last_modified, year, month)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (bucket, key) DO UPDATE SET
+                        size = excluded.size, etag = excluded.etag, last_modified = excluded.last_modified,
+                        year = excluded.year, month = excluded.month
+                    WHERE objects.etag IS NOT excluded.etag OR objects.size IS NOT excluded.size
+                """, rows)
+            changed = self.conn.total_changes - changes
+            now = time.time()
+            # Drop cached keys that no longer exist
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen_keys (key TEXT PRIMARY KEY)")
+            self.conn.execute("DELETE FROM seen_keys")
+            self.conn.executemany("INSERT OR IGNORE INTO seen_keys VALUES (?)", ((k,) for k in seen))
+            self.conn.execute("""
+                DELETE FROM objects WHERE bucket = ? AND key >= ? AND key < ?
+                AND key NOT IN (SELECT key FROM seen_keys)
+            """, (bucket, low, high))
+            self.conn.execute("""
+                INSERT INTO refreshes (bucket, prefix, refreshed_at, full_refreshed_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (bucket, prefix) DO UPDATE SET
+                    refreshed_at = excluded.refreshed_at,
+                    full_refreshed_at = excluded.full_refreshed_at
+            """, (bucket, prefix, now, now))
+        self._refreshed.add((bucket, prefix))
+        print(f"[Inventory] Refreshed s3://{bucket}/{prefix}: {len(seen)} keys listed, {changed} added or changed "
+              f"in {time.perf_counter() - start:.2f}s")
+        return changed
+
+    def objects(self, bucket, prefix="", year=None, start_year=None, end_year=None, suffixes=None):
+        """Cached objects under ``prefix`` as dicts, in key order.
+
+        ``year`` / ``start_year`` / ``end_year`` filter on the year parsed from
+        the file name, not on a substring of the key.
+        """
+        low, high = self._prefix_range(prefix)
+        sql = "SELECT * FROM objects WHERE bucket = ? AND key >= ? AND key < ?"
+        params = [bucket, low, high]
+        if year is not None:
+            sql += " AND year = ?"
+            params.append(int(year))
+        if start_year is not None:
+            sql += " AND year >= ?"
+            params.append(int(start_year))
+        if end_year is not None:
+            sql += " AND year <= ?"
+            params.append(int(end_year))
+        rows = [dict(row) for row in self.conn.execute(sql + " ORDER BY key", params)]
+        if suffixes:
+            rows = [row for row in rows if row["key"].endswith(tuple(suffixes))]
+        return rows
+
+    def keys(self, bucket, prefix="", **filters):
+        return [row["key"] for row in self.objects(bucket, prefix, **filters)]
+
+
+_inventory = None
+
+
+def get_inventory():
+    """Process-wide S3Inventory, so a run lists each prefix at most once."""
+    global _inventory
+    if _inventory is None:
+        _inventory = S3Inventory()
+    return _inventory
@@ -0,0 +1,162 @@
+from data_models.base import BaseBikeShareRecord
+
+
+class LoadLedger:
+    """Bookkeeping for which S3 objects have been loaded, keyed by S3 key + ETag.
+
+    Progress rows are written on the loader's own connection just before each
+    commit, so the ledger and the raw tables always agree on how many rows of a
+    file are durable. A rerun skips files marked complete and resumes partial
+    ones after their last committed row.
+
+    ``size_bytes`` and ``content_sha256`` identify a file's contents, so a
+    byte-identical copy uploaded under another key is recognised and skipped
+    (``duplicate_of``); ``rows_duplicate`` counts rows dropped by the
+    row-key index (see data_models.dedup). ``load_batch_id`` is the batch
+    (transaction id) of the file's last commit, matching the raw rows'
+    ``load_batch_id``.
+    """
+
+    table = "load_ledger"
+
+    STATUS_IN_PROGRESS = "in_progress"
+    STATUS_COMPLETE = "complete"
+    STATUS_FAILED = "failed"
+
+    @classmethod
+    def get_schema_sql(cls) -> str:
+        return f"""CREATE TABLE IF NOT EXISTS {cls.table} (
+    s3_key TEXT NOT NULL,
+    etag TEXT NOT NULL,
+    status TEXT NOT NULL,
+    staging_table TEXT,
+    chunksize INTEGER,
+    rows_loaded BIGINT NOT NULL DEFAULT 0,
+    chunks_committed INTEGER NOT NULL DEFAULT 0,
+    load_seconds DOUBLE PRECISION NOT NULL DEFAULT 0,
+    error TEXT,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP,
+    size_bytes BIGINT,
+    content_sha256 TEXT,
+    rows_duplicate BIGINT NOT NULL DEFAULT 0,
+    duplicate_of TEXT,
+    load_batch_id BIGINT,
+    PRIMARY KEY (s3_key, etag)
+);
+CREATE INDEX IF NOT EXISTS {cls.table}_content_idx ON {cls.table} (etag, size_bytes);"""
+
+    # Columns added after the table was first created; create_table adds any that are missing
+    ADDED_COLUMNS = {
+        "size_bytes": "BIGINT",
+        "content_sha256": "TEXT",
+        "rows_duplicate": "BIGINT NOT NULL DEFAULT 0",
+        "duplicate_of": "TEXT",
+        "load_batch_id": "BIGINT",
+    }
+
+    @classmethod
+    def create_table(cls):
+        conn = BaseBikeShareRecord._connect()
+        try:
+            with conn.cursor() as cur:
+                for column, sql_type in cls.ADDED_COLUMNS.items():
+                    cur.execute(f"ALTER TABLE IF EXISTS {cls.table} ADD COLUMN IF NOT EXISTS {column} {sql_type}")
+                cur.execute(cls.get_schema_sql())
+            conn.commit()
+        finally:
+            conn.close()
+        print(f"Created table (if not exists): {cls.table}")
+
+    @classmethod
+    def begin(cls, conn, s3_key, etag, chunksize, size_bytes=None):
+        """Register an attempt at ``s3_key``/``etag`` and return its prior state.
+
+        Returns a dict with ``status`` and ``rows_loaded``; a new file starts at
+        zero rows. The registration is committed immediately so concurrent
+        workers and later runs can see it.
+        """
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""INSERT INTO {cls.table} (s3_key, etag, status, chunksize, size_bytes)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT (s3_key, etag) DO UPDATE
+                    SET status = CASE WHEN {cls.table}.status = %s THEN {cls.table}.status ELSE %s END,
+                        error = NULL,
+                        updated_at = CURRENT_TIMESTAMP
+                    RETURNING status, rows_loaded, chunks_committed""",
+                (s3_key, etag, cls.STATUS_IN_PROGRESS, chunksize, size_bytes,
+                 cls.STATUS_COMPLETE, cls.STATUS_IN_PROGRESS)
+            )
+            status, rows_loaded, chunks_committed = cur.fetchone()
+        conn.commit()
+        return {"status": status, "rows_loaded": rows_loaded, "chunks_committed": chunks_committed}
+
+    @classmethod
+    def record_progress(cls, conn, s3_key, etag, staging_table, rows_loaded, chunks_committed, load_seconds):
+        """Update progress inside the caller's open transaction (not committed here)."""
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""UPDATE {cls.table}
+                    SET staging_table = %s, rows_loaded = %s, chunks_committed = %s,
+                        load_seconds = %s, updated_at = CURRENT_TIMESTAMP, load_batch_id = txid_current()
+                    WHERE s3_key = %s AND etag = %s""",
+                (staging_table, rows_loaded, chunks_committed, load_seconds, s3_key, etag)
+            )
+
+    @classmethod
+    def mark_complete(cls, conn, s3_key, etag, content_sha256=None, rows_duplicate=0, duplicate_of=None):
+        """Mark a file finished inside the caller's open transaction."""
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""UPDATE {cls.table}
+                    SET status = %s, finished_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP,
+                        content_sha256 = COALESCE(%s, content_sha256),
+                        rows_duplicate = rows_duplicate + %s,
+                        duplicate_of = %s
+                    WHERE s3_key = %s AND etag = %s""",
+                (cls.STATUS_COMPLETE, content_sha256, rows_duplicate, duplicate_of, s3_key, etag)
+            )
+
+    @classmethod
+    def find_identical(cls, conn, s3_key, etag, size_bytes):
+        """Another completely loaded key with the same ETag and size (same bytes), or None.
+
+        ETags are content MD5s (per part for multipart uploads), so together
+        with the size they identify a re-upload of the same file under a new name.
+        """
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""SELECT s3_key FROM {cls.table}
+                    WHERE etag = %s AND size_bytes = %s AND s3_key <> %s AND status = %s
+                    LIMIT 1""",
+                (etag, size_bytes, s3_key, cls.STATUS_COMPLETE)
+            )
+            row = cur.fetchone()
+        return row[0] if row else None
+
+    @classmethod
+    def find_by_content(cls, conn, s3_key, content_sha256):
+        """Another completely loaded key whose contents hash to ``content_sha256``, or None."""
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""SELECT s3_key FROM {cls.table}
+                    WHERE content_sha256 = %s AND s3_key <> %s AND status = %s
+                    LIMIT 1""",
+                (content_sha256, s3_key, cls.STATUS_COMPLETE)
+            )
+            row = cur.fetchone()
+        return row[0] if row else None
+
+    @classmethod
+    def mark_failed(cls, conn, s3_key, etag, error):
+        """Record a failure in its own transaction; rows_loaded keeps the last committed offset."""
+        with conn.cursor() as cur:
+            cur.execute(
+                f"""UPDATE {cls.table}
+                    SET status = %s, error = %s, updated_at = CURRENT_TIMESTAMP
+                    WHERE s3_key = %s AND etag = %s""",
+                (cls.STATUS_FAILED, error[:1000], s3_key, etag)
+            )
+        conn.commit()
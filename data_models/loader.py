@@ -0,0 +1,167 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from data_models.base import BaseBikeShareRecord, WRITE_MODES
+
+
+class LoaderSession:
+    """Holds one database connection for a whole load run.
+
+    Chunk writes are grouped into transactions: with ``commit_rows=None`` every
+    file is committed once when it finishes, otherwise a commit is issued as
+    soon as ``commit_rows`` rows are pending. A failed chunk rolls back the
+    open transaction, leaving only previously committed batches in place.
+    """
+
+    def __init__(self, write_mode="copy", commit_rows=None):
+        if write_mode not in WRITE_MODES:
+            raise ValueError(f"Unknown write_mode {write_mode!r}, expected one of {WRITE_MODES}")
+        self.write_mode = write_mode
+        self.commit_rows = commit_rows
+        self.conn = None
+        # Optional callable run on the connection just before every commit, so
+        # bookkeeping (e.g. the load ledger) lands in the same transaction.
+        self.before_commit = None
+        self.pending_rows = 0
+        self.committed_rows = 0
+        self.commits = 0
+        self.write_seconds = 0.0
+
+    def connection(self):
+        """Return the session connection, opening it on first use."""
+        if self.conn is None or self.conn.closed:
+            self.conn = BaseBikeShareRecord._connect()
+        return self.conn
+
+    def write(self, model, df):
+        """Write a chunk inside the open transaction, committing when the batch is full."""
+        self.write_seconds += model.to_database(df, mode=self.write_mode, conn=self.connection())
+        self.pending_rows += len(df)
+        if self.commit_rows and self.pending_rows >= self.commit_rows:
+            self.commit()
+
+    def commit(self):
+        if self.conn is None or self.conn.closed:
+            return
+        if self.before_commit is not None:
+            self.before_commit(self.conn)
+        start = time.perf_counter()
+        self.conn.commit()
+        self.write_seconds += time.perf_counter() - start
+        if self.pending_rows:
+            print(f"[Commit] {self.pending_rows} rows committed")
+            self.committed_rows += self.pending_rows
+            self.commits += 1
+        self.pending_rows = 0
+
+    def rollback(self):
+        if self.conn is None or self.conn.closed:
+            self.pending_rows = 0
+            return
+        self.conn.rollback()
+        if self.pending_rows:
+            print(f"[Rollback] Discarded {self.pending_rows} uncommitted rows")
+        self.pending_rows = 0
+
+    def end_file(self):
+        """Commit whatever the current file left pending."""
+        self.commit()
+
+    def close(self):
+        if self.conn is not None and not self.conn.closed:
+            self.conn.close()
+        self.conn = None
+
+    def summary(self):
+        rate = self.committed_rows / self.write_seconds if self.write_seconds > 0 else 0
+        return (f"[{self.write_mode}] Wrote {self.committed_rows} rows in {self.write_seconds:.2f}s "
+                f"over {self.commits} commits ({rate:,.0f} rows/sec)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        self.close()
+        return False
+
+
+def summarize_results(results, wall_seconds):
+    """Merge per-file results into one run summary and print it."""
+    failures = [r for r in results if r["error"] is not None]
+    skipped = [r for r in results if r.get("skipped")]
+    total_rows = sum(r["rows"] for r in results)
+    duplicates = sum(r.get("duplicates", 0) for r in results)
+    summary = {
+        "files": len(results),
+        "skipped": len(skipped),
+        "rows": total_rows,
+        "wall_seconds": wall_seconds,
+        "file_seconds": sum(r["seconds"] for r in results),
+        "rows_per_sec": total_rows / wall_seconds if wall_seconds > 0 else 0,
+        "duplicates": duplicates,
+        "failures": failures,
+    }
+    print(f"\n[Summary] {summary['files']} files, {total_rows} rows in {wall_seconds:.1f}s "
+          f"({summary['rows_per_sec']:,.0f} rows/sec), {duplicates} duplicate rows dropped, "
+          f"{len(skipped)} already loaded, {len(failures)} failed")
+    for failure in failures:
+        print(f"  FAILED {failure['s3_key']}: {failure['error']}")
+    return summary
+
+
+# Each pool worker keeps its own session (and so its own connection) for the
+# lifetime of the process; it is created by the pool initializer. Every file
+# ends with a commit, so nothing is pending when the worker exits.
+_worker_session = None
+
+
+def _init_worker(write_mode, commit_rows):
+    global _worker_session
+    _worker_session = LoaderSession(write_mode=write_mode, commit_rows=commit_rows)
+
+
+def _load_file_in_worker(s3_key, prefix, dry_run, chunksize, engine, memory_budget=None, dedup=True):
+    return BaseBikeShareRecord.load_file(s3_key, prefix, _worker_session, dry_run=dry_run, chunksize=chunksize,
+                                         engine=engine, memory_budget=memory_budget, dedup=dedup)
+
+
+def load_files_parallel(files, prefix, workers, dry_run=False, chunksize=10000, write_mode="copy",
+                        commit_rows=None, max_in_flight=None, engine="c", memory_budget=None,
+                        dedup=True):
+    """Load ``files`` on a pool of ``workers`` processes and return the merged summary.
+
+    At most ``max_in_flight`` files (default: one per worker) are submitted at
+    a time, so only that many download buffers and parsed chunks exist at once.
+    ``memory_budget`` is per worker process.
+    """
+    if write_mode not in WRITE_MODES:
+        raise ValueError(f"Unknown write_mode {write_mode!r}, expected one of {WRITE_MODES}")
+    max_in_flight = max_in_flight or workers
+    print(f"Loading {len(files)} files with {workers} workers (max {max_in_flight} in flight)")
+    start = time.perf_counter()
+    results = []
+    pending = {}
+    remaining = iter(files)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(write_mode, commit_rows)) as pool:
+        while True:
+            while len(pending) < max_in_flight:
+                s3_key = next(remaining, None)
+                if s3_key is None:
+                    break
+                pending[pool.submit(_load_file_in_worker, s3_key, prefix, dry_run, chunksize, engine,
+                                      memory_budget, dedup)] = s3_key
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                s3_key = pending.pop(future)
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    # The worker process itself died (e.g. OOM); record it like any other failure.
+                    results.append({"s3_key": s3_key, "rows": 0, "seconds": 0.0, "error": str(e), "skipped": False})
+    return summarize_results(results, time.perf_counter() - start)
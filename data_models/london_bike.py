@@ -1,10 +1,12 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Dict, Any
-import pandas as pd
+from typing import Optional, Dict, Any, TYPE_CHECKING
 from data_models.base import BaseBikeShareRecord
 import re
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 @dataclass
 class LondonLegacyBikeShareRecord(BaseBikeShareRecord):
     """Model for London bike share data from 2018-2020 (legacy schema)."""
@@ -21,40 +23,42 @@ class LondonLegacyBikeShareRecord(BaseBikeShareRecord):
 
     staging_table = "raw_london_legacy"
     s3_prefix = "london_csv/"
+    location = "london"
+    schema_version = "legacy"
+    start_time_field = "start_date"
+    categorical_columns = ["start_station_id", "start_station_name", "end_station_id", "end_station_name"]
+    compact_dtypes = {"duration": "Int32"}
+    row_key_columns = ["rental_id"]
+    required_columns = [
+        "Rental Id",
+        "Bike Id",
+        "Start Date",
+        "End Date",
+        "StartStation Id",
+        "StartStation Name",
+        "EndStation Id",
+        "EndStation Name",
+        "Duration"
+    ]
+    column_map = {
+        "Rental Id": "rental_id",
+        "Bike Id": "bike_id",
+        "Start Date": "start_date",
+        "End Date": "end_date",
+        "Duration": "duration",
+        "StartStation Id": "start_station_id",
+        "StartStation Name": "start_station_name",
+        "EndStation Id": "end_station_id",
+        "EndStation Name": "end_station_name"
+    }
 
     @classmethod
-    def validate_schema(cls, df: pd.DataFrame) -> bool:
-        """Validate if the dataframe contains all required columns for legacy London format."""
-        required_columns = [
-            "Rental Id",
-            "Bike Id",
-            "Start Date",
-            "End Date",
-            "StartStation Id",
-            "StartStation Name",
-            "EndStation Id",
-            "EndStation Name",
-            "Duration"
-        ]
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        return not missing_columns
-
-    @classmethod
-    def to_dataframe(cls, df: pd.DataFrame, source_file: str) -> pd.DataFrame:
-        df = df.rename(columns={
-            "Rental Id": "rental_id",
-            "Bike Id": "bike_id",
-            "Start Date": "start_date",
-            "End Date": "end_date",
-            "Duration": "duration",
-            "StartStation Id": "start_station_id",
-            "StartStation Name": "start_station_name",
-            "EndStation Id": "end_station_id",
-            "EndStation Name": "end_station_name"
-        })
-        df["source_file"] = source_file
+    def to_dataframe(cls, df: "pd.DataFrame", source_file: str) -> "pd.DataFrame":
+        import pandas as pd
+        df = df.rename(columns=cls.column_map)
+        df["source_file"] = cls.constant_column(source_file, df.index)
         for col in ["start_date", "end_date"]:
-            df[col] = pd.to_datetime(df[col], format="%d/%m/%Y %H:%M").dt.strftime("%Y-%m-%d %H:%M:%S")
+            df[col] = pd.to_datetime(df[col], format="%d/%m/%Y %H:%M")
         return df[list(cls.__dataclass_fields__.keys())]
 
 @dataclass
@@ -75,41 +79,43 @@ class LondonModernBikeShareRecord(BaseBikeShareRecord):
 
     staging_table = "raw_london_modern"
     s3_prefix = "london_csv/"
+    location = "london"
+    schema_version = "modern"
+    start_time_field = "start_date"
+    categorical_columns = ["bike_model", "start_station_number", "start_station", "end_station_number",
+                           "end_station"]
+    row_key_columns = ["number"]
+    required_columns = [
+        "Number",
+        "Bike model",
+        "Start date",
+        "End date",
+        "Start station number",
+        "Start station",
+        "End station number",
+        "End station",
+        "Total duration"
+    ]
+    column_map = {
+        "Number": "number",
+        "Bike number": "bike_number",
+        "Bike model": "bike_model",
+        "Start date": "start_date",
+        "End date": "end_date",
+        "Total duration": "total_duration",
+        "Total duration (ms)": "total_duration_ms",
+        "Start station number": "start_station_number",
+        "Start station": "start_station",
+        "End station number": "end_station_number",
+        "End station": "end_station"
+    }
 
     @classmethod
-    def validate_schema(cls, df: pd.DataFrame) -> bool:
-        """Validate if the dataframe contains all required columns for modern London format."""
-        required_columns = [
-            "Number",
-            "Bike model",
-            "Start date",
-            "End date",
-            "Start station number",
-            "Start station",
-            "End station number",
-            "End station",
-            "Total duration"
-        ]
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        return not missing_columns
-
-    @classmethod
-    def to_dataframe(cls, df: pd.DataFrame, source_file: str) -> pd.DataFrame:
-        df = df.rename(columns={
-            "Number": "number",
-            "Bike number": "bike_number",
-            "Bike model": "bike_model",
-            "Start date": "start_date",
-            "End date": "end_date",
-            "Total duration": "total_duration",
-            "Total duration (ms)": "total_duration_ms",
-            "Start station number": "start_station_number",
-            "Start station": "start_station",
-            "End station number": "end_station_number",
-            "End station": "end_station"
-        })
-        df["source_file"] = source_file
+    def to_dataframe(cls, df: "pd.DataFrame", source_file: str) -> "pd.DataFrame":
+        import pandas as pd
+        df = df.rename(columns=cls.column_map)
+        df["source_file"] = cls.constant_column(source_file, df.index)
         for col in ["start_date", "end_date"]:
-            # Modern format uses YYYY-MM-DD HH:MM
-            df[col] = pd.to_datetime(df[col], format="%Y-%m-%d %H:%M").dt.strftime("%Y-%m-%d %H:%M:%S")
+            # Modern format uses YYYY-MM-DD HH:MM; kept as datetime64 through to the TIMESTAMP column
+            df[col] = pd.to_datetime(df[col], format="%Y-%m-%d %H:%M")
         return df[list(cls.__dataclass_fields__.keys())] 
\ No newline at end of file
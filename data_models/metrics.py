@@ -0,0 +1,204 @@
+import os
+import gc
+import json
+import time
+import socket
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import psutil
+
+STAGES = ("download", "parse", "transform", "write")
+# Every Nth chunk gets a per-chunk record with an RSS/GC sample; per-file
+# records are always written.
+DEFAULT_CHUNK_SAMPLE = 10
+
+
+def _rss_mb():
+    return psutil.Process().memory_info().rss / 1024 / 1024
+
+
+class MetricsSink:
+    """Destination for ingestion metrics.
+
+    ``jsonl_path`` appends one JSON object per line (``"type": "chunk"`` or
+    ``"file"``); every worker process appends to the same file. ``prom_dir``
+    maintains a Prometheus textfile (one per process, for node_exporter's
+    textfile collector) with running totals per stage. Both are optional; a
+    sink with neither only feeds the per-file summary line.
+
+    Configured from ``INGEST_METRICS_FILE`` / ``INGEST_METRICS_PROM_DIR`` /
+    ``INGEST_METRICS_CHUNK_SAMPLE`` so pool workers inherit it.
+    """
+
+    def __init__(self, jsonl_path=None, prom_dir=None, chunk_sample=DEFAULT_CHUNK_SAMPLE):
+        self.jsonl_path = jsonl_path
+        self.prom_dir = prom_dir
+        self.chunk_sample = max(int(chunk_sample), 1)
+        self.totals = {"files": 0, "failed_files": 0, "rows": 0, "bytes": 0, "chunks": 0,
+                       **{f"{stage}_seconds": 0.0 for stage in STAGES}}
+        self.peak_rss_mb = 0.0
+        self._lock = threading.Lock()
+        self.pid = os.getpid()
+        self._labels = {"host": socket.gethostname(), "pid": self.pid}
+
+    @classmethod
+    def from_env(cls):
+        return cls(jsonl_path=os.environ.get("INGEST_METRICS_FILE") or None,
+                   prom_dir=os.environ.get("INGEST_METRICS_PROM_DIR") or None,
+                   chunk_sample=os.environ.get("INGEST_METRICS_CHUNK_SAMPLE", DEFAULT_CHUNK_SAMPLE))
+
+    def emit(self, record):
+        if not self.jsonl_path:
+            return
+        line = json.dumps({"ts": datetime.now(timezone.utc).isoformat(), **self._labels, **record}, default=str)
+        with self._lock, open(self.jsonl_path, "a") as f:
+            f.write(line + "\n")
+
+    def file_finished(self, record):
+        with self._lock:
+            self.totals["files"] += 1
+            self.totals["failed_files"] += record["error"] is not None
+            for key in ("rows", "bytes", "chunks"):
+                self.totals[key] += record[key]
+            for stage in STAGES:
+                self.totals[f"{stage}_seconds"] += record["stages"][stage]
+            self.peak_rss_mb = max(self.peak_rss_mb, record["peak_rss_mb"])
+        self.emit(record)
+        if self.prom_dir:
+            self._write_prom()
+
+    def _write_prom(self):
+        labels = f'pid="{self._labels["pid"]}"'
+        lines = [
+            "# HELP city_cycles_ingest_files_total Files processed by the loader.",
+            "# TYPE city_cycles_ingest_files_total counter",
+            f"city_cycles_ingest_files_total{{{labels}}} {self.totals['files']}",
+            "# TYPE city_cycles_ingest_failed_files_total counter",
+            f"city_cycles_ingest_failed_files_total{{{labels}}} {self.totals['failed_files']}",
+            "# TYPE city_cycles_ingest_rows_total counter",
+            f"city_cycles_ingest_rows_total{{{labels}}} {self.totals['rows']}",
+            "# TYPE city_cycles_ingest_bytes_total counter",
+            f"city_cycles_ingest_bytes_total{{{labels}}} {self.totals['bytes']}",
+            "# TYPE city_cycles_ingest_chunks_total counter",
+            f"city_cycles_ingest_chunks_total{{{labels}}} {self.totals['chunks']}",
+            "# HELP city_cycles_ingest_stage_seconds_total Time spent per loader stage.",
+            "# TYPE city_cycles_ingest_stage_seconds_total counter",
+        ]
+        lines += [f'city_cycles_ingest_stage_seconds_total{{{labels},stage="{stage}"}} '
+                  f'{self.totals[f"{stage}_seconds"]:.4f}' for stage in STAGES]
+        lines += [
+            "# TYPE city_cycles_ingest_peak_rss_megabytes gauge",
+            f"city_cycles_ingest_peak_rss_megabytes{{{labels}}} {self.peak_rss_mb:.1f}",
+        ]
+        os.makedirs(self.prom_dir, exist_ok=True)
+        path = os.path.join(self.prom_dir, f"city_cycles_ingest_{self._labels['pid']}.prom")
+        # Write then rename, so the collector never scrapes a half-written file
+        with open(path + ".tmp", "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(path + ".tmp", path)
+
+
+class FileMetrics:
+    """Per-file stage timings, byte/row counts and sampled memory for one load.
+
+    ``download`` is the time the parser sat waiting on the S3 prefetcher;
+    ``parse`` is the rest of the time spent pulling chunks from the reader.
+    RSS and GC counters are sampled every ``sink.chunk_sample`` chunks rather
+    than forcing a collection per chunk.
+    """
+
+    def __init__(self, sink, s3_key, model=None):
+        self.sink = sink
+        self.s3_key = s3_key
+        self.model = model
+        self.reader = None
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.rows = 0
+        self.chunks = 0
+        self.peak_rss_mb = _rss_mb()
+        self._start = time.perf_counter()
+        self._chunk = dict.fromkeys(STAGES, 0.0)
+        self._wait_seen = 0.0
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if name == "parse" and self.reader is not None:
+                # Split reader time into network wait and actual parsing
+                waited = self.reader.wait_seconds - self._wait_seen
+                self._wait_seen = self.reader.wait_seconds
+                self._chunk["download"] += waited
+                elapsed -= waited
+            self._chunk[name] += elapsed
+
+    @property
+    def bytes_read(self):
+        return self.reader.bytes_read if self.reader is not None else 0
+
+    def chunk_done(self, rows):
+        self.chunks += 1
+        self.rows += rows
+        for stage, seconds in self._chunk.items():
+            self.stages[stage] += seconds
+        if self.chunks % self.sink.chunk_sample == 1 or self.sink.chunk_sample == 1:
+            rss = _rss_mb()
+            self.peak_rss_mb = max(self.peak_rss_mb, rss)
+            busy = sum(self._chunk.values())
+            self.sink.emit({
+                "type": "chunk",
+                "s3_key": self.s3_key,
+                "model": self.model,
+                "chunk": self.chunks,
+                "rows": rows,
+                "bytes_read": self.bytes_read,
+                "stages": {stage: round(seconds, 4) for stage, seconds in self._chunk.items()},
+                "rows_per_sec": round(rows / busy, 1) if busy > 0 else None,
+                "rss_mb": round(rss, 1),
+                "gc_counts": gc.get_count(),
+                "gc_collections": [gen["collections"] for gen in gc.get_stats()],
+            })
+        self._chunk = dict.fromkeys(STAGES, 0.0)
+
+    def finish(self, error=None, skipped=False):
+        self.peak_rss_mb = max(self.peak_rss_mb, _rss_mb())
+        seconds = time.perf_counter() - self._start
+        record = {
+            "type": "file",
+            "s3_key": self.s3_key,
+            "model": self.model,
+            "rows": self.rows,
+            "bytes": self.bytes_read,
+            "chunks": self.chunks,
+            "seconds": round(seconds, 4),
+            "stages": {stage: round(value, 4) for stage, value in self.stages.items()},
+            "rows_per_sec": round(self.rows / seconds, 1) if seconds > 0 else None,
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "skipped": skipped,
+            "error": error,
+        }
+        self.sink.file_finished(record)
+        return record
+
+    def summary_line(self):
+        stages = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in self.stages.items())
+        return (f"[Metrics] {self.rows} rows, {self.bytes_read / 1024 / 1024:.1f} MB read in {self.chunks} chunks "
+                f"({stages}), peak RSS {self.peak_rss_mb:.0f} MB")
+
+
+_sink = None
+
+
+def get_sink():
+    """Process-wide MetricsSink built from the environment.
+
+    Rebuilt after a fork, so pool workers never inherit the parent's totals.
+    """
+    global _sink
+    if _sink is None or _sink.pid != os.getpid():
+        _sink = MetricsSink.from_env()
+    return _sink
@@ -1,10 +1,12 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Dict, Any
-import pandas as pd
+from typing import Optional, Dict, Any, TYPE_CHECKING
 from data_models.base import BaseBikeShareRecord
 import re
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 @dataclass
 class NYCLegacyBikeShareRecord(BaseBikeShareRecord):
     tripduration: int
@@ -26,50 +28,61 @@ class NYCLegacyBikeShareRecord(BaseBikeShareRecord):
 
     staging_table = "raw_nyc_legacy"
     s3_prefix = "nyc_csv/"
+    location = "nyc"
+    schema_version = "legacy"
+    start_time_field = "starttime"
+    categorical_columns = ["start_station_id", "start_station_name", "end_station_id", "end_station_name",
+                           "usertype"]
+    # Same natural key stg_nyc_legacy deduplicates on
+    row_key_columns = ["bikeid", "starttime", "stoptime", "start_station_id"]
+    compact_dtypes = {
+        "tripduration": "Int32",
+        "start_station_latitude": "float32",
+        "start_station_longitude": "float32",
+        "end_station_latitude": "float32",
+        "end_station_longitude": "float32",
+        "birth_year": "Int16",
+        "gender": "Int8",
+    }
+    required_columns = [
+        "tripduration",
+        "starttime",
+        "stoptime",
+        "start station id",
+        "start station name",
+        "start station latitude",
+        "start station longitude",
+        "end station id",
+        "end station name",
+        "end station latitude",
+        "end station longitude",
+        "bikeid",
+        "usertype",
+        "birth year",
+        "gender"
+    ]
+    column_map = {
+        "tripduration": "tripduration",
+        "bikeid": "bikeid",
+        "starttime": "starttime",
+        "stoptime": "stoptime",
+        "start station id": "start_station_id",
+        "start station name": "start_station_name",
+        "start station latitude": "start_station_latitude",
+        "start station longitude": "start_station_longitude",
+        "end station id": "end_station_id",
+        "end station name": "end_station_name",
+        "end station latitude": "end_station_latitude",
+        "end station longitude": "end_station_longitude",
+        "usertype": "usertype",
+        "birth year": "birth_year",
+        "gender": "gender"
+    }
 
     @classmethod
-    def validate_schema(cls, df: pd.DataFrame) -> bool:
-        """Validate if the dataframe contains all required columns for legacy NYC format."""
-        required_columns = [
-            "tripduration",
-            "starttime",
-            "stoptime",
-            "start station id",
-            "start station name",
-            "start station latitude",
-            "start station longitude",
-            "end station id",
-            "end station name",
-            "end station latitude",
-            "end station longitude",
-            "bikeid",
-            "usertype",
-            "birth year",
-            "gender"
-        ]
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        return not missing_columns
-
-    @classmethod
-    def to_dataframe(cls, df: pd.DataFrame, source_file: str) -> pd.DataFrame:
-        df = df.rename(columns={
-            "tripduration": "tripduration",
-            "bikeid": "bikeid",
-            "starttime": "starttime",
-            "stoptime": "stoptime",
-            "start station id": "start_station_id",
-            "start station name": "start_station_name",
-            "start station latitude": "start_station_latitude",
-            "start station longitude": "start_station_longitude",
-            "end station id": "end_station_id",
-            "end station name": "end_station_name",
-            "end station latitude": "end_station_latitude",
-            "end station longitude": "end_station_longitude",
-            "usertype": "usertype",
-            "birth year": "birth_year",
-            "gender": "gender"
-        })
-        df["source_file"] = source_file
+    def to_dataframe(cls, df: "pd.DataFrame", source_file: str) -> "pd.DataFrame":
+        df = df.rename(columns=cls.column_map)
+        df["source_file"] = cls.constant_column(source_file, df.index)
         return df[list(cls.__dataclass_fields__.keys())]
 
 @dataclass
@@ -91,44 +104,46 @@ class NYCModernBikeShareRecord(BaseBikeShareRecord):
 
     staging_table = "raw_nyc_modern"
     s3_prefix = "nyc_csv/"
+    location = "nyc"
+    schema_version = "modern"
+    start_time_field = "started_at"
+    categorical_columns = ["rideable_type", "start_station_id", "start_station_name", "end_station_id",
+                           "end_station_name", "member_casual"]
+    compact_dtypes = {"start_lat": "float32", "start_lng": "float32", "end_lat": "float32", "end_lng": "float32"}
+    row_key_columns = ["ride_id"]
+    required_columns = [
+        "ride_id",
+        "rideable_type",
+        "started_at",
+        "ended_at",
+        "start_station_name",
+        "start_station_id",
+        "end_station_name",
+        "end_station_id",
+        "start_lat",
+        "start_lng",
+        "end_lat",
+        "end_lng",
+        "member_casual"
+    ]
+    column_map = {
+        "ride_id": "ride_id",
+        "rideable_type": "rideable_type",
+        "started_at": "started_at",
+        "ended_at": "ended_at",
+        "start_station_id": "start_station_id",
+        "start_station_name": "start_station_name",
+        "end_station_id": "end_station_id",
+        "end_station_name": "end_station_name",
+        "start_lat": "start_lat",
+        "start_lng": "start_lng",
+        "end_lat": "end_lat",
+        "end_lng": "end_lng",
+        "member_casual": "member_casual"
+    }
 
     @classmethod
-    def validate_schema(cls, df: pd.DataFrame) -> bool:
-        """Validate if the dataframe contains all required columns for modern NYC format."""
-        required_columns = [
-            "ride_id",
-            "rideable_type",
-            "started_at",
-            "ended_at",
-            "start_station_name",
-            "start_station_id",
-            "end_station_name",
-            "end_station_id",
-            "start_lat",
-            "start_lng",
-            "end_lat",
-            "end_lng",
-            "member_casual"
-        ]
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        return not missing_columns
-
-    @classmethod
-    def to_dataframe(cls, df: pd.DataFrame, source_file: str) -> pd.DataFrame:
-        df = df.rename(columns={
-            "ride_id": "ride_id",
-            "rideable_type": "rideable_type",
-            "started_at": "started_at",
-            "ended_at": "ended_at",
-            "start_station_id": "start_station_id",
-            "start_station_name": "start_station_name",
-            "end_station_id": "end_station_id",
-            "end_station_name": "end_station_name",
-            "start_lat": "start_lat",
-            "start_lng": "start_lng",
-            "end_lat": "end_lat",
-            "end_lng": "end_lng",
-            "member_casual": "member_casual"
-        })
-        df["source_file"] = source_file
+    def to_dataframe(cls, df: "pd.DataFrame", source_file: str) -> "pd.DataFrame":
+        df = df.rename(columns=cls.column_map)
+        df["source_file"] = cls.constant_column(source_file, df.index)
         return df[list(cls.__dataclass_fields__.keys())] 
\ No newline at end of file
@@ -0,0 +1,223 @@
+import os
+import json
+import time
+from io import BytesIO
+import pandas as pd
+from data_models.base import BaseBikeShareRecord, normalize_header
+from data_models.settings import get_settings, get_s3_client
+from data_models.csv_reader import read_csv_chunks
+
+PARQUET_PREFIX = "parquet"
+MANIFEST_NAME = "_manifest.json"
+# Rows buffered per partition before a part file is written; large enough to
+# give each part file a healthy row group, small enough to bound memory.
+PART_ROWS = 1_000_000
+
+
+class ParquetLake:
+    """Columnar copy of every model's to_dataframe output.
+
+    Files are zstd-compressed Parquet laid out Hive-style as
+    ``city=<location>/schema_version=<version>/year=<YYYY>/month=<MM>/``, so
+    readers such as ``pyarrow.dataset`` can prune partitions from the path. A
+    JSON manifest at the root records each part file's source CSV, row count
+    and min/max start time, and doubles as the list of converted sources.
+
+    ``root`` is either a local directory or ``s3://bucket/prefix``; the default
+    is the ``parquet/`` prefix of the project bucket.
+    """
+
+    def __init__(self, root=None, part_rows=PART_ROWS):
+        if root is None:
+            root = f"s3://{get_settings().require_bucket()}/{PARQUET_PREFIX}"
+        self.root = root.rstrip("/")
+        self.part_rows = part_rows
+        self._s3 = get_s3_client() if self.root.startswith("s3://") else None
+        self.manifest = self._load_manifest()
+
+    # --- storage -----------------------------------------------------------
+
+    def _split_s3(self, path):
+        bucket, _, key = path[len("s3://"):].partition("/")
+        return bucket, key
+
+    def _write_bytes(self, path, data):
+        if self._s3 is not None:
+            bucket, key = self._split_s3(path)
+            self._s3.put_object(Bucket=bucket, Key=key, Body=data)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+
+    def _delete(self, path):
+        if self._s3 is not None:
+            bucket, key = self._split_s3(path)
+            self._s3.delete_object(Bucket=bucket, Key=key)
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def _read_bytes(self, path):
+        """Return the object's bytes, or None if it does not exist."""
+        if self._s3 is not None:
+            bucket, key = self._split_s3(path)
+            try:
+                return self._s3.get_object(Bucket=bucket, Key=key)["Body"].read()
+            except self._s3.exceptions.NoSuchKey:
+                return None
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    # --- manifest ----------------------------------------------------------
+
+    @property
+    def manifest_path(self):
+        return f"{self.root}/{MANIFEST_NAME}"
+
+    def _load_manifest(self):
+        data = self._read_bytes(self.manifest_path)
+        return json.loads(data) if data else {"sources": {}, "parts": []}
+
+    def _save_manifest(self):
+        self._write_bytes(self.manifest_path, json.dumps(self.manifest, indent=2, default=str).encode("utf-8"))
+
+    def is_converted(self, source_file):
+        return source_file in self.manifest["sources"]
+
+    def remove_source(self, source_file):
+        """Delete a source's part files and manifest entries; returns parts removed."""
+        stale = [part for part in self.manifest["parts"] if part["source_file"] == source_file]
+        if not stale and source_file not in self.manifest["sources"]:
+            return 0
+        for part in stale:
+            self._delete(part["path"])
+        self.manifest["parts"] = [part for part in self.manifest["parts"] if part["source_file"] != source_file]
+        self.manifest["sources"].pop(source_file, None)
+        self._save_manifest()
+        print(f"[Parquet] Removed {len(stale)} existing parts of {source_file}")
+        return len(stale)
+
+    # --- writing -----------------------------------------------------------
+
+    def partition_path(self, model, year, month):
+        return (f"{self.root}/city={model.location}/schema_version={model.schema_version}"
+                f"/year={year:04d}/month={month:02d}")
+
+    def _write_part(self, model, source_file, year, month, frames, part_num):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        df = pd.concat(frames, ignore_index=True)
+        # concat falls back to object when chunks' categories differ; re-encode
+        # so those columns are written as Parquet dictionary columns
+        for col in frames[0].select_dtypes("category").columns:
+            if df[col].dtype == object:
+                df[col] = df[col].astype("category")
+        starts = df.pop("_start_time")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        buffer = BytesIO()
+        pq.write_table(table, buffer, compression="zstd")
+        stem = os.path.splitext(source_file)[0]
+        path = f"{self.partition_path(model, year, month)}/{stem}-{part_num:05d}.parquet"
+        self._write_bytes(path, buffer.getvalue())
+        part = {
+            "path": path,
+            "source_file": source_file,
+            "model": model.__name__,
+            "city": model.location,
+            "schema_version": model.schema_version,
+            "year": year,
+            "month": month,
+            "rows": len(df),
+            "bytes": buffer.tell(),
+            "min_start_time": starts.min(),
+            "max_start_time": starts.max(),
+        }
+        self.manifest["parts"].append(part)
+        print(f"[Parquet] Wrote {len(df)} rows to {path}")
+        return part
+
+    def write_chunks(self, model, source_file, chunks):
+        """Partition and write an iterable of to_dataframe outputs for one source file.
+
+        Parts left by an earlier conversion of the same file are removed first,
+        so a re-conversion replaces rather than adds to them.
+        """
+        self.remove_source(source_file)
+        start = time.perf_counter()
+        buffers, buffered_rows = {}, {}
+        part_num = 0
+        total_rows = 0
+
+        def flush(key):
+            nonlocal part_num
+            part_num += 1
+            self._write_part(model, source_file, key[0], key[1], buffers.pop(key), part_num)
+            buffered_rows.pop(key)
+
+        for df in chunks:
+            starts = pd.to_datetime(df[model.start_time_field], format="ISO8601", errors="coerce")
+            df = df.assign(_start_time=starts)
+            total_rows += len(df)
+            # Rows whose start time does not parse land in year=0000/month=00
+            # rather than being dropped by groupby.
+            years = starts.dt.year.fillna(0).astype(int)
+            months = starts.dt.month.fillna(0).astype(int)
+            for (year, month), group in df.groupby([years, months]):
+                key = (int(year), int(month))
+                buffers.setdefault(key, []).append(group)
+                buffered_rows[key] = buffered_rows.get(key, 0) + len(group)
+                if buffered_rows[key] >= self.part_rows:
+                    flush(key)
+        for key in list(buffers):
+            flush(key)
+        self.manifest["sources"][source_file] = {
+            "model": model.__name__,
+            "rows": total_rows,
+            "parts": part_num,
+            "seconds": round(time.perf_counter() - start, 2),
+        }
+        self._save_manifest()
+        return total_rows
+
+    def convert_s3_file(self, s3_key, s3_prefix, chunksize=250000, engine="c", force=False):
+        """Convert one raw CSV from S3 into partitioned Parquet; returns rows written."""
+        source_file = os.path.basename(s3_key)
+        if self.is_converted(source_file) and not force:
+            print(f"Skipping {source_file}: already in parquet manifest")
+            return 0
+        model = BaseBikeShareRecord.route_s3_key(s3_key, s3_prefix)
+        if model is None:
+            return 0
+        stream = BaseBikeShareRecord.open_csv_stream_from_s3(s3_key)
+        try:
+            chunks = read_csv_chunks(stream, chunksize=chunksize, engine=engine, dtypes=model.get_csv_dtypes())
+            aligned = (model.to_dataframe(chunk.set_axis(normalize_header(chunk.columns), axis=1), source_file)
+                       for chunk in chunks)
+            rows = self.write_chunks(model, source_file, aligned)
+        finally:
+            stream.close()
+        print(f"Converted {source_file}: {rows} rows")
+        return rows
+
+    # --- reading -----------------------------------------------------------
+
+    def dataset(self, city=None, schema_version=None):
+        """Open the lake (or one city/schema_version subtree) as a pyarrow dataset.
+
+        Filters on the ``year``/``month`` partition columns, e.g.
+        ``ds.to_table(filter=(pc.field("year") == 2023))``, only touch the
+        matching directories.
+        """
+        import pyarrow.dataset as pads
+        path = self.root
+        if city:
+            path += f"/city={city}"
+            if schema_version:
+                path += f"/schema_version={schema_version}"
+        if self._s3 is not None:
+            from pyarrow import fs
+            return pads.dataset(path[len("s3://"):], format="parquet", partitioning="hive",
+                                filesystem=fs.S3FileSystem())
+        return pads.dataset(path, format="parquet", partitioning="hive")
@@ -0,0 +1,141 @@
+import io
+import time
+import zlib
+import queue
+import threading
+
+# Defaults keep at most 4 x 8 MB of undecoded CSV in memory per open file.
+DEFAULT_BLOCK_SIZE = 8 * 1024 * 1024
+DEFAULT_PREFETCH_BLOCKS = 4
+
+
+class PrefetchingReader(io.RawIOBase):
+    """Read-only file object over an S3 ``get_object`` body.
+
+    A background thread pulls fixed-size blocks from the streaming body into a
+    bounded queue while the consumer (``pd.read_csv``) parses earlier blocks, so
+    download and parsing overlap and memory is capped at
+    ``block_size * max_blocks`` regardless of object size.
+    """
+
+    def __init__(self, body, block_size=DEFAULT_BLOCK_SIZE, max_blocks=DEFAULT_PREFETCH_BLOCKS, hasher=None):
+        super().__init__()
+        self._body = body
+        # Optional hashlib object updated with each block on the download thread
+        self.hasher = hasher
+        self._block_size = block_size
+        self._queue = queue.Queue(maxsize=max_blocks)
+        self._stop = threading.Event()
+        self._current = memoryview(b"")
+        self._eof = False
+        self.bytes_read = 0
+        # Time the consumer spent blocked waiting for the network: the part of
+        # "reading" that is download rather than parsing.
+        self.wait_seconds = 0.0
+        self._thread = threading.Thread(target=self._fill, daemon=True)
+        self._thread.start()
+
+    def _fill(self):
+        try:
+            while not self._stop.is_set():
+                block = self._body.read(self._block_size)
+                if not block:
+                    break
+                if self.hasher is not None:
+                    self.hasher.update(block)
+                self._put(block)
+        except Exception as e:
+            self._put(e)
+            return
+        self._put(None)
+
+    def _put(self, item):
+        # Poll so close() can stop a producer blocked on a full queue.
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if not self._current and not self._eof:
+            start = time.perf_counter()
+            item = self._queue.get()
+            self.wait_seconds += time.perf_counter() - start
+            if isinstance(item, Exception):
+                raise item
+            if item is None:
+                self._eof = True
+            else:
+                self._current = memoryview(item)
+        if self._eof and not self._current:
+            return 0
+        n = min(len(b), len(self._current))
+        b[:n] = self._current[:n]
+        self._current = self._current[n:]
+        self.bytes_read += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._body.close()
+        super().close()
+
+
+def prefetching_reader(stream):
+    """The PrefetchingReader under a stream from open_s3_stream (possibly gzip-wrapped), or None."""
+    stream = getattr(stream, "myfileobj", None) or stream
+    raw = getattr(stream, "raw", stream)
+    return raw if isinstance(raw, PrefetchingReader) else None
+
+
+def open_s3_stream(s3, bucket, key, prefetch=True, block_size=DEFAULT_BLOCK_SIZE,
+                   max_blocks=DEFAULT_PREFETCH_BLOCKS, if_match=None, hasher=None):
+    """Open ``s3://bucket/key`` for streaming reads.
+
+    Returns ``(stream, response)`` where ``response`` is the ``get_object``
+    response (ETag, ContentLength, ...). With ``prefetch=False`` the raw body
+    is returned and blocks are fetched on demand by the reader. ``if_match``
+    makes the request fail if the object no longer has that ETag. ``hasher``
+    is updated with the body's bytes (prefetching streams only).
+    """
+    kwargs = {"IfMatch": if_match} if if_match else {}
+    response = s3.get_object(Bucket=bucket, Key=key, **kwargs)
+    body = response["Body"]
+    if not prefetch:
+        return body, response
+    return io.BufferedReader(PrefetchingReader(body, block_size, max_blocks, hasher), buffer_size=block_size), response
+
+
+def read_s3_first_line(s3, bucket, key, initial_bytes=4096, max_bytes=256 * 1024):
+    """Return the first line of an object using small ranged GETs.
+
+    Starts with ``initial_bytes`` and doubles the range until a newline shows
+    up (or the object ends), so routing a file never downloads its body.
+    Gzipped objects (``.gz``) are decompressed from the partial range. A
+    zero-byte object, for which S3 rejects any range, returns "".
+    """
+    from botocore.exceptions import ClientError
+    size = initial_bytes
+    while True:
+        try:
+            body = s3.get_object(Bucket=bucket, Key=key, Range=f"bytes=0-{size - 1}")["Body"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "InvalidRange":
+                return ""
+            raise
+        raw = body.read()
+        body.close()
+        # wbits=31 expects a gzip header; a truncated stream decompresses as far as it goes
+        data = zlib.decompressobj(31).decompress(raw) if key.endswith(".gz") else raw
+        newline = data.find(b"\n")
+        if newline != -1:
+            return data[:newline].decode("utf-8-sig").rstrip("\r")
+        if len(raw) < size or size >= max_bytes:
+            return data.decode("utf-8-sig").rstrip("\r")
+        size *= 2
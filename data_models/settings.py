@@ -0,0 +1,75 @@
+import os
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+_lock = threading.Lock()
+_settings = None
+# pid -> client: boto3 clients hold pooled connections that must not be
+# shared across a fork, so each process (e.g. a loader pool worker) builds its own.
+_s3_clients = {}
+
+
+@dataclass(frozen=True)
+class Settings:
+    """S3 and database configuration, read once per process from the environment / .env."""
+    s3_bucket: Optional[str]
+    db_host: Optional[str]
+    db_user: Optional[str]
+    db_password: Optional[str]
+    db_name: Optional[str]
+    db_port: str
+
+    def require_bucket(self) -> str:
+        if not self.s3_bucket:
+            raise ValueError("S3_BUCKET environment variable is not set!")
+        return self.s3_bucket
+
+    def db_params(self) -> dict:
+        return {"host": self.db_host, "user": self.db_user, "password": self.db_password,
+                "dbname": self.db_name, "port": self.db_port}
+
+
+def get_settings() -> Settings:
+    """Process-wide Settings; ``.env`` is parsed on the first call only."""
+    global _settings
+    if _settings is None:
+        with _lock:
+            if _settings is None:
+                from dotenv import load_dotenv
+                load_dotenv()
+                _settings = Settings(
+                    s3_bucket=os.environ.get("S3_BUCKET"),
+                    db_host=os.environ.get("DB_HOST"),
+                    db_user=os.environ.get("DB_USER"),
+                    db_password=os.environ.get("DB_PASSWORD"),
+                    db_name=os.environ.get("DB_NAME"),
+                    db_port=os.environ.get("DB_PORT", "5432"),
+                )
+    return _settings
+
+
+def get_s3_client():
+    """Process-wide boto3 S3 client for the project bucket, created on first use."""
+    pid = os.getpid()
+    client = _s3_clients.get(pid)
+    if client is None:
+        # Credentials may come from .env. Load it before taking _lock, which
+        # get_settings takes too and is not reentrant.
+        get_settings()
+        with _lock:
+            client = _s3_clients.get(pid)
+            if client is None:
+                import boto3
+                client = boto3.client("s3")
+                _s3_clients.clear()
+                _s3_clients[pid] = client
+    return client
+
+
+def reset():
+    """Forget cached settings and clients (e.g. after changing the environment in tests)."""
+    global _settings
+    with _lock:
+        _settings = None
+        _s3_clients.clear()
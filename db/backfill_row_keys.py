@@ -0,0 +1,17 @@
+import sys
+from data_models.base import BaseBikeShareRecord
+from data_models.dedup import RowKeyIndex
+
+# Seed the row-key tables from rows loaded before ingest-time dedup existed.
+# Usage: python db/backfill_row_keys.py [<staging_table> ...]   (default: every raw table)
+def main():
+    RowKeyIndex.create_tables()
+    tables = set(sys.argv[1:])
+    for model in BaseBikeShareRecord._registry:
+        if not model.row_key_columns or (tables and model.staging_table not in tables):
+            continue
+        print(f"\n--- Backfilling {RowKeyIndex.table(model)} from {model.staging_table} ---")
+        RowKeyIndex.backfill(model)
+
+if __name__ == "__main__":
+    main()
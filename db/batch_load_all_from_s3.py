@@ -1,14 +1,37 @@
+import os
+import argparse
 from data_models.base import BaseBikeShareRecord
+from data_models.chunking import parse_size
 
 PREFIXES = ["london_csv/", "nyc_csv/"]
 
 def main():
+    parser = argparse.ArgumentParser(description="Load every CSV under the known S3 prefixes.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of loader processes; each holds its own DB connection (default: 1)")
+    parser.add_argument("--commit-rows", type=int, default=None,
+                        help="Commit every N rows instead of once per file")
+    parser.add_argument("--engine", choices=["c", "pyarrow"], default="c",
+                        help="CSV parser: pandas' C engine or the multi-threaded pyarrow reader (default: c)")
+    parser.add_argument("--memory-budget", type=parse_size,
+                        help="Total memory for all loader processes, e.g. 8G; chunk sizes adapt to stay under it")
+    parser.add_argument("--no-dedup", dest="dedup", action="store_false",
+                        help="Skip content-hash and row-key deduplication")
+    parser.add_argument("--metrics-file", help="Append per-file/per-chunk metrics as JSON lines to this path")
+    parser.add_argument("--metrics-prom-dir", help="Write Prometheus textfiles with loader totals to this directory")
+    args = parser.parse_args()
+    # Read by data_models.metrics; set in the environment so pool workers inherit it
+    if args.metrics_file:
+        os.environ["INGEST_METRICS_FILE"] = args.metrics_file
+    if args.metrics_prom_dir:
+        os.environ["INGEST_METRICS_PROM_DIR"] = args.metrics_prom_dir
     for prefix in PREFIXES:
         print(f"\n--- Processing files in {prefix} ---")
         try:
-            BaseBikeShareRecord.load_from_s3(prefix=prefix)
+            BaseBikeShareRecord.load_from_s3(prefix=prefix, workers=args.workers, commit_rows=args.commit_rows,
+                                              engine=args.engine, memory_budget=args.memory_budget, dedup=args.dedup)
         except Exception as e:
             print(f"[ERROR] Failed to load files for prefix {prefix}: {e}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -1,22 +1,47 @@
+import os
 import sys
 from data_models.base import BaseBikeShareRecord
+from data_models.chunking import parse_size
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python db/batch_load_from_s3.py <s3_prefix> [<year>|<filename>] [--dry-run]")
+        print("Usage: python db/batch_load_from_s3.py <s3_prefix> [<year>|<filename>] [--dry-run] [--mode=copy|execute_values] [--commit-rows=N] [--workers=N] [--engine=c|pyarrow] [--memory-budget=8G] [--no-dedup] [--metrics-file=PATH] [--metrics-prom-dir=DIR]")
         sys.exit(1)
     s3_prefix = sys.argv[1]
     year = None
     filename = None
     dry_run = False
+    write_mode = "copy"
+    commit_rows = None
+    workers = 1
+    engine = "c"
+    memory_budget = None
+    dedup = True
     for arg in sys.argv[2:]:
         if arg.isdigit():
             year = int(arg)
         elif arg == "--dry-run":
             dry_run = True
-        elif arg.endswith('.csv'):
+        elif arg.startswith("--mode="):
+            write_mode = arg.split("=", 1)[1]
+        elif arg.startswith("--commit-rows="):
+            commit_rows = int(arg.split("=", 1)[1]) or None
+        elif arg.startswith("--workers="):
+            workers = int(arg.split("=", 1)[1])
+        elif arg.startswith("--engine="):
+            engine = arg.split("=", 1)[1]
+        elif arg == "--no-dedup":
+            dedup = False
+        elif arg.startswith("--memory-budget="):
+            memory_budget = parse_size(arg.split("=", 1)[1])
+        elif arg.startswith("--metrics-file="):
+            # Read by data_models.metrics; set in the environment so pool workers inherit it
+            os.environ["INGEST_METRICS_FILE"] = arg.split("=", 1)[1]
+        elif arg.startswith("--metrics-prom-dir="):
+            os.environ["INGEST_METRICS_PROM_DIR"] = arg.split("=", 1)[1]
+        elif arg.endswith(('.csv', '.csv.gz')):
             filename = arg
-    BaseBikeShareRecord.load_from_s3(prefix=s3_prefix, year=year, filename=filename, dry_run=dry_run)
+    BaseBikeShareRecord.load_from_s3(prefix=s3_prefix, year=year, filename=filename, dry_run=dry_run, write_mode=write_mode, commit_rows=commit_rows, workers=workers, engine=engine, memory_budget=memory_budget, dedup=dedup)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,37 @@
+import sys
+from data_models.base import BaseBikeShareRecord
+from data_models.parquet_lake import ParquetLake
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python -m db.convert_to_parquet <s3_prefix> [<year>|<filename>] [--root=DIR|s3://bucket/prefix] [--force]")
+        sys.exit(1)
+    s3_prefix = sys.argv[1]
+    year = None
+    filename = None
+    root = None
+    force = False
+    for arg in sys.argv[2:]:
+        if arg.isdigit():
+            year = int(arg)
+        elif arg.startswith("--root="):
+            root = arg.split("=", 1)[1]
+        elif arg == "--force":
+            force = True
+        elif arg.endswith('.csv'):
+            filename = arg
+    lake = ParquetLake(root=root)
+    files = BaseBikeShareRecord.list_s3_files(prefix=s3_prefix, year=year)
+    if filename:
+        files = [f for f in files if f.endswith("/" + filename) or f == filename]
+    print(f"Converting {len(files)} files from {s3_prefix} to {lake.root}")
+    total = 0
+    for s3_key in files:
+        try:
+            total += lake.convert_s3_file(s3_key, s3_prefix, force=force)
+        except Exception as e:
+            print(f"ERROR: Failed to convert {s3_key}: {e}")
+    print(f"Done: {total} rows written to {lake.root}")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
 from data_models.base import BaseBikeShareRecord
+from data_models.ledger import LoadLedger
+from data_models.dedup import RowKeyIndex
 
 if __name__ == "__main__":
-    BaseBikeShareRecord.create_all_tables() 
\ No newline at end of file
+    BaseBikeShareRecord.create_all_tables()
+    LoadLedger.create_table()
+    RowKeyIndex.create_tables()
@@ -0,0 +1,9 @@
+from data_models.base import BaseBikeShareRecord
+from data_models.ledger import LoadLedger
+from data_models.dedup import RowKeyIndex
+
+if __name__ == "__main__":
+    BaseBikeShareRecord.migrate_all_tables()
+    # Adds any ledger columns introduced since the table was created
+    LoadLedger.create_table()
+    RowKeyIndex.create_tables()
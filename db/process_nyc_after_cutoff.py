@@ -1,5 +1,5 @@
-import os
 import sys
+import os
 from data_models.base import BaseBikeShareRecord
 
 NYC_PREFIX = "nyc_csv/"
@@ -9,23 +9,25 @@ def main():
     dry_run = True
     if len(sys.argv) > 1 and sys.argv[1] == "--run":
         dry_run = False
-    files = BaseBikeShareRecord.list_s3_files(prefix=NYC_PREFIX)
-    files = sorted([os.path.basename(f) for f in files])
+    # One (incremental) listing via the S3 inventory cache; load_from_s3 then
+    # takes the keys directly and does not list again.
+    keys = sorted(BaseBikeShareRecord.list_s3_files(prefix=NYC_PREFIX), key=os.path.basename)
+    files = [os.path.basename(k) for k in keys]
     try:
         cutoff_idx = files.index(CUTOFF_FILENAME)
     except ValueError:
         print(f"Cutoff file {CUTOFF_FILENAME} not found in S3 listing.")
         return
-    files_to_process = files[cutoff_idx:]
+    keys_to_process = keys[cutoff_idx:]
     print("Files to process:")
-    for f in files_to_process:
-        print(f)
+    for k in keys_to_process:
+        print(os.path.basename(k))
     if dry_run:
         print("\n(DRY RUN: No files will be loaded)")
         return
-    for f in files_to_process:
-        print(f"\nProcessing {f} ...")
-        os.system(f"python -m db.batch_load_from_s3 nyc_csv/ {f}")
+    # The load ledger skips files that are already complete and resumes partial
+    # ones, so rerunning this script does not double-insert.
+    BaseBikeShareRecord.load_from_s3(prefix=NYC_PREFIX, keys=keys_to_process)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,26 @@
+{#
+    Days whose daily aggregates must be recomputed on an incremental run.
+
+    A day is "touched" when `source` has a row for it that was (re)loaded after
+    the newest `source_updated_at` already merged into the model being built.
+    The watermark is moved back by `mart_lookback_hours` so rows committed
+    while the previous run was in flight are not missed; recomputing a day
+    twice is harmless because the marts merge with delete+insert.
+
+    Returns a parenthesised subquery with one column, `day`; alias it at the
+    call site:
+
+        join {{ touched_days(ref('int_nyc_rides')) }} d
+          on m.start_time >= d.day and m.start_time < d.day + interval '1 day'
+#}
+{% macro touched_days(source, time_column='start_time', updated_column='dbt_updated_at') %}
+(
+    select distinct date_trunc('day', {{ time_column }}) as day
+    from {{ source }}
+    where {{ updated_column }} > (
+        select coalesce(max(source_updated_at), '-infinity'::timestamptz)
+               - interval '{{ var("mart_lookback_hours", 24) }} hours'
+        from {{ this }}
+    )
+)
+{% endmacro %}
@@ -0,0 +1,37 @@
+{#
+    Incremental filter on the `load_batch_id` watermark that raw tables carry
+    (the id of the transaction that loaded each row; see data_models.base).
+
+    Incremental runs select rows with
+        last processed batch < load_batch_id < oldest in-flight transaction
+    which is a range scan on the load_batch_id index rather than an
+    anti-join against every source_file already in the target. The upper
+    bound keeps the watermark behind any load that is still running: its rows
+    are invisible now and, once committed, still sort above the watermark.
+
+    Full refreshes also take rows loaded before the column existed (NULL).
+    An incremental target built before the column existed holds exactly
+    those rows, so it gets every non-NULL batch until on_schema_change adds
+    the column (the watermark subquery would fail on it).
+
+    Pass `where` to compute the watermark over a subset of the target, e.g.
+    one schema_version of a model that unions several sources whose
+    watermarks advance separately.
+
+    Usage: `where {{ load_batch_filter() }}`
+#}
+{% macro load_batch_filter(where=none, column='load_batch_id') %}
+{%- set incremental = is_incremental_run() -%}
+{%- set target_columns = adapter.get_columns_in_relation(this) | map(attribute='name') | map('lower') | list if incremental else [] -%}
+{%- if column | lower in target_columns -%}
+{{ column }} > (
+    select coalesce(max({{ column }}), 0) from {{ this }}
+    {%- if where %} where {{ where }}{% endif %}
+)
+and {{ column }} < txid_snapshot_xmin(txid_current_snapshot())
+{%- elif incremental -%}
+({{ column }} < txid_snapshot_xmin(txid_current_snapshot()))
+{%- else -%}
+({{ column }} < txid_snapshot_xmin(txid_current_snapshot()) or {{ column }} is null)
+{%- endif -%}
+{% endmacro %}
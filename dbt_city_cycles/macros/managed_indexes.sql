@@ -0,0 +1,22 @@
+{#
+    Post-hook creating every index in the model's `managed_indexes` config
+    that does not exist yet.
+
+    dbt's own `indexes` config is applied only when a table is (re)built, so
+    an index added to an incremental model would never appear on its
+    existing table, and names embed a timestamp so they cannot be checked
+    for. Managed indexes get stable names (`<table>__<columns>_idx`) and use
+    `create index if not exists`: a full build creates them once after the
+    data is loaded, and an incremental run creates only those missing.
+
+    Each entry takes `columns` and optionally `unique` and `type`
+    (e.g. 'brin'), like dbt's `indexes`.
+#}
+{% macro create_missing_indexes() %}
+{%- for index in config.get('managed_indexes', []) -%}
+create {% if index.get('unique') %}unique {% endif %}index if not exists
+    "{{ this.identifier }}__{{ index['columns'] | join('_') }}_idx"
+    on {{ this }}
+    {%- if index.get('type') %} using {{ index['type'] }}{% endif %} ({{ index['columns'] | join(', ') }});
+{% endfor -%}
+{% endmacro %}
@@ -0,0 +1,127 @@
+{#
+    Incremental table range-partitioned by month on `partition_column`
+    (default `start_time`) using Postgres declarative partitioning.
+
+    Every run first materialises the model's rows in a temp table, then
+    creates a `<table>_pYYYYMM` partition for each month they cover that does
+    not exist yet, and inserts them. Rows whose partition column is NULL go to
+    `<table>_pdefault`. With `unique_key` the matching rows are deleted first
+    (delete+insert). Queries bounded on the partition column only touch the
+    months they cover.
+
+    Indexes come from `managed_indexes` via the `create_missing_indexes`
+    post-hook; created on the parent table, they cascade to every partition,
+    including ones attached later. Postgres requires unique indexes on a
+    partitioned table to include the partition column, so a unique_key is
+    enforced by the delete+insert rather than by an index.
+
+    Models read `is_incremental_run()` instead of `is_incremental()`, which
+    only recognises the built-in incremental materialization.
+#}
+{% materialization partitioned_incremental, adapter='postgres' %}
+  {%- set partition_column = config.get('partition_column', 'start_time') -%}
+  {%- set unique_key = config.get('unique_key') -%}
+  {%- set on_schema_change = incremental_validate_on_schema_change(config.get('on_schema_change'), default='ignore') -%}
+  {%- set target_relation = this.incorporate(type='table') -%}
+  {%- set existing_relation = load_cached_relation(this) -%}
+  {%- set full_build = existing_relation is none or should_full_refresh() -%}
+  {%- set new_rows = make_temp_relation(target_relation, '__dbt_new') -%}
+
+  {% if not full_build and not is_partitioned_table(target_relation) %}
+    {{ exceptions.raise_compiler_error(
+        target_relation ~ " is not partitioned yet; rebuild it once with --full-refresh") }}
+  {% endif %}
+
+  {{ run_hooks(pre_hooks, inside_transaction=False) }}
+  {{ run_hooks(pre_hooks, inside_transaction=True) }}
+
+  {% call statement('new_rows') %}
+    {{ get_create_table_as_sql(True, new_rows, sql) }}
+  {% endcall %}
+
+  {% if full_build %}
+    {% if existing_relation is not none %}
+      {% do adapter.drop_relation(existing_relation) %}
+    {% endif %}
+    {% call statement('create_parent') %}
+      create table {{ target_relation }} (like {{ new_rows }} including defaults)
+          partition by range ({{ partition_column }});
+      create table {{ month_partition(target_relation, 'default') }}
+          partition of {{ target_relation }} default;
+    {% endcall %}
+  {% else %}
+    {% do process_schema_changes(on_schema_change, new_rows, existing_relation) %}
+  {% endif %}
+
+  {% do create_month_partitions(target_relation, new_rows, partition_column) %}
+
+  {% if unique_key and not full_build %}
+    {%- set keys = [unique_key] if unique_key is string else unique_key -%}
+    {% call statement('delete_existing') %}
+      delete from {{ target_relation }} as target
+      using {{ new_rows }} as new_rows
+      where {% for key in keys %}target.{{ key }} = new_rows.{{ key }}{% if not loop.last %} and {% endif %}{% endfor %}
+    {% endcall %}
+  {% endif %}
+
+  {%- set columns = get_quoted_csv(adapter.get_columns_in_relation(new_rows) | map(attribute='name')) -%}
+  {% call statement('main') %}
+    insert into {{ target_relation }} ({{ columns }})
+    select {{ columns }} from {{ new_rows }}
+  {% endcall %}
+
+  {{ run_hooks(post_hooks, inside_transaction=True) }}
+  {% do adapter.commit() %}
+  {{ run_hooks(post_hooks, inside_transaction=False) }}
+
+  {% do persist_docs(target_relation, model) %}
+  {{ return({'relations': [target_relation]}) }}
+{% endmaterialization %}
+
+
+{% macro month_partition(parent, suffix) %}
+  {{ return(api.Relation.create(database=parent.database, schema=parent.schema,
+                                identifier=parent.identifier ~ '_p' ~ suffix, type='table')) }}
+{% endmacro %}
+
+
+{% macro create_month_partitions(parent, rows_relation, partition_column) %}
+  {%- set months = run_query(
+      "select distinct date_trunc('month', " ~ partition_column ~ ") from " ~ rows_relation
+      ~ " where " ~ partition_column ~ " is not null order by 1") -%}
+  {% if months.rows | length > 0 %}
+    {% call statement('create_month_partitions') %}
+      {% for row in months.rows %}
+        {%- set month_start = row[0] -%}
+        {%- set next_month = month_start + modules.datetime.timedelta(days=32) -%}
+        create table if not exists {{ month_partition(parent, month_start.strftime('%Y%m')) }}
+            partition of {{ parent }}
+            for values from ('{{ month_start.strftime('%Y-%m-01') }}') to ('{{ next_month.strftime('%Y-%m-01') }}');
+      {% endfor %}
+    {% endcall %}
+  {% endif %}
+{% endmacro %}
+
+
+{% macro is_partitioned_table(relation) %}
+  {%- set result = run_query(
+      "select c.relkind from pg_class c join pg_namespace n on n.oid = c.relnamespace"
+      ~ " where n.nspname = '" ~ relation.schema ~ "' and c.relname = '" ~ relation.identifier ~ "'") -%}
+  {{ return(result.rows | length > 0 and result.rows[0][0] == 'p') }}
+{% endmacro %}
+
+
+{#
+    is_incremental() for models that may use partitioned_incremental: true
+    when the model's table exists and this is not a full refresh.
+#}
+{% macro is_incremental_run() %}
+  {% if not execute %}
+    {{ return(false) }}
+  {% elif model.config.materialized == 'partitioned_incremental' %}
+    {%- set relation = adapter.get_relation(this.database, this.schema, this.table) -%}
+    {{ return(relation is not none and not should_full_refresh()) }}
+  {% else %}
+    {{ return(is_incremental()) }}
+  {% endif %}
+{% endmacro %}
@@ -1,11 +1,16 @@
 {{ config(
-    materialized='incremental',
+    materialized='partitioned_incremental',
+    partition_column='start_time',
     unique_key='ride_id',
-    indexes=[
-        {'columns': ['start_time']},
-        {'columns': ['ride_id'], 'unique': true},
-        {'columns': ['bike_id']}
-    ]
+    on_schema_change='append_new_columns',
+    managed_indexes=[
+        {'columns': ['start_time'], 'type': 'brin'},
+        {'columns': ['ride_id']},
+        {'columns': ['bike_id']},
+        {'columns': ['dbt_updated_at'], 'type': 'brin'},
+        {'columns': ['schema_version', 'load_batch_id']}
+    ],
+    post_hook="{{ create_missing_indexes() }}"
 ) }}
 
 with modern_rides as (
@@ -20,13 +25,12 @@ with modern_rides as (
         end_station_name,
         duration_seconds,
         source_file,
+        load_batch_id,
         location,
         schema_version,
         dbt_updated_at
     from {{ ref('stg_london_modern') }}
-    {% if is_incremental() %}
-    where source_file not in (select distinct source_file from {{ this }})
-    {% endif %}
+    where {{ load_batch_filter(where="schema_version = 'modern'") }}
 ),
 
 legacy_rides as (
@@ -41,13 +45,12 @@ legacy_rides as (
         end_station_name,
         duration_seconds,
         source_file,
+        load_batch_id,
         location,
         schema_version,
         dbt_updated_at
     from {{ ref('stg_london_legacy') }}
-    {% if is_incremental() %}
-    where source_file not in (select distinct source_file from {{ this }})
-    {% endif %}
+    where {{ load_batch_filter(where="schema_version = 'legacy'") }}
 ),
 
 combined_rides as (
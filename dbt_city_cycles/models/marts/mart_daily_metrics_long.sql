@@ -1,75 +1,53 @@
 {{ config(
-    materialized='table'
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key=['location', 'date'],
+    indexes=[
+        {'columns': ['location', 'date']},
+        {'columns': ['date']}
+    ]
 ) }}
 
+-- Incremental runs take only the days the daily marts rewrote since the last
+-- run and replace every metric row for those (location, date) pairs.
 with combined_daily as (
-    select date, location, year, day_type, total_rides, avg_duration_minutes, member_rides, casual_rides, total_minutes_biked, population, rides_per_1000
+    select date, location, year, day_type, total_rides, avg_duration_minutes, member_rides, casual_rides, total_minutes_biked, population, rides_per_1000, source_updated_at
     from {{ ref('mart_nyc_daily_metrics') }}
+    {% if is_incremental() %}
+    where source_updated_at > (
+        select coalesce(max(source_updated_at), '-infinity'::timestamptz) - interval '{{ var("mart_lookback_hours", 24) }} hours'
+        from {{ this }}
+    )
+    {% endif %}
     union all
-    select date, location, year, day_type, total_rides, avg_duration_minutes, null as member_rides, null as casual_rides, total_minutes_biked, population, rides_per_1000
+    select date, location, year, day_type, total_rides, avg_duration_minutes, null as member_rides, null as casual_rides, total_minutes_biked, population, rides_per_1000, source_updated_at
     from {{ ref('mart_london_daily_metrics') }}
+    {% if is_incremental() %}
+    where source_updated_at > (
+        select coalesce(max(source_updated_at), '-infinity'::timestamptz) - interval '{{ var("mart_lookback_hours", 24) }} hours'
+        from {{ this }}
+    )
+    {% endif %}
 )
 
+-- Unpivot in a single pass over combined_daily rather than one scan per metric
 select
-    date,
-    location,
-    year,
-    day_type,
-    'total_rides' as metric_name,
-    total_rides::float as metric_value
-from combined_daily
-union all
-select
-    date,
-    location,
-    year,
-    day_type,
-    'avg_duration_minutes' as metric_name,
-    avg_duration_minutes as metric_value
-from combined_daily
-union all
-select
-    date,
-    location,
-    year,
-    day_type,
-    'member_rides' as metric_name,
-    member_rides::float as metric_value
-from combined_daily where member_rides is not null
-union all
-select
-    date,
-    location,
-    year,
-    day_type,
-    'casual_rides' as metric_name,
-    casual_rides::float as metric_value
-from combined_daily where casual_rides is not null
-union all
-select
-    date,
-    location,
-    year,
-    day_type,
-    'total_minutes_biked' as metric_name,
-    total_minutes_biked as metric_value
-from combined_daily
-union all
-select
-    date,
-    location,
-    year,
-    day_type,
-    'population' as metric_name,
-    population::float as metric_value
-from combined_daily
-union all
-select
-    date,
-    location,
-    year,
-    day_type,
-    'rides_per_1000' as metric_name,
-    rides_per_1000 as metric_value
-from combined_daily
-order by date, location, metric_name 
\ No newline at end of file
+    d.date,
+    d.location,
+    d.year,
+    d.day_type,
+    m.metric_name,
+    m.metric_value,
+    d.source_updated_at
+from combined_daily d
+cross join lateral (values
+    ('total_rides', d.total_rides::float),
+    ('avg_duration_minutes', d.avg_duration_minutes::float),
+    ('member_rides', d.member_rides::float),
+    ('casual_rides', d.casual_rides::float),
+    ('total_minutes_biked', d.total_minutes_biked::float),
+    ('population', d.population::float),
+    ('rides_per_1000', d.rides_per_1000::float)
+) as m(metric_name, metric_value)
+-- London has no member/casual split; other metrics keep their NULLs as before
+where m.metric_value is not null or m.metric_name not in ('member_rides', 'casual_rides')
@@ -2,10 +2,12 @@
     materialized='table'
 ) }}
 
+-- Lifetime totals by hour; for a date range, aggregate mart_station_hourly_rollup directly
 select
     location,
-    extract(hour from start_time) as hour_of_day,
-    count(*) as ride_count
-from {{ ref('int_london_rides') }}
+    hour_of_day,
+    sum(ride_count)::bigint as ride_count
+from {{ ref('mart_station_hourly_rollup') }}
+where location = 'london'
 group by 1, 2
-order by 2 
\ No newline at end of file
+order by 2
@@ -5,10 +5,13 @@
 with station_counts as (
     select 
         location,
-        extract(year from start_time) as year,
-        count(distinct start_station_id) as station_count
-    from {{ ref('int_london_rides') }}
+        extract(year from date) as year,
+        -- Stations where at least one ride started that year
+        count(distinct station_id) filter (where ride_count > 0) as station_count
+    from {{ ref('mart_station_hourly_rollup') }}
+    where location = 'london'
     group by 1, 2
+    having sum(ride_count) > 0
 ),
 growth_calc as (
     select 
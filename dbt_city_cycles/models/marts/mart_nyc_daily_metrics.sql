@@ -1,22 +1,38 @@
 {{ config(
-    materialized='table'
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key=['location', 'date'],
+    indexes=[
+        {'columns': ['location', 'date']},
+        {'columns': ['source_updated_at']}
+    ]
 ) }}
 
+-- Aggregated from the station x hour rollup. Incremental runs recompute only
+-- the days the rollup rewrote since this mart's last run (see the
+-- touched_days macro) and replace those days in place.
 select
-    m.location,
-    date_trunc('day', m.start_time) as date,
-    extract(year from m.start_time) as year,
-    CASE WHEN EXTRACT(ISODOW FROM date_trunc('day', m.start_time)) < 6 THEN 'weekday' ELSE 'weekend' END AS day_type,
-    count(*) as total_rides,
-    avg(m.duration_seconds)/60 as avg_duration_minutes,
-    sum(case when m.user_type = 'member' then 1 else 0 end) as member_rides,
-    sum(case when m.user_type = 'casual' then 1 else 0 end) as casual_rides,
-    sum(m.duration_seconds)/60 as total_minutes_biked,
+    r.location,
+    r.date,
+    extract(year from r.date) as year,
+    CASE WHEN EXTRACT(ISODOW FROM r.date) < 6 THEN 'weekday' ELSE 'weekend' END AS day_type,
+    sum(r.ride_count)::bigint as total_rides,
+    sum(r.duration_seconds_sum) / nullif(sum(r.duration_count), 0) / 60 as avg_duration_minutes,
+    sum(r.member_rides)::bigint as member_rides,
+    sum(r.casual_rides)::bigint as casual_rides,
+    sum(r.duration_seconds_sum)/60 as total_minutes_biked,
     p.population,
-    (count(*)::float / nullif(p.population, 0)) * 1000 as rides_per_1000
-from {{ ref('int_nyc_rides') }} m
+    (sum(r.ride_count)::float / nullif(p.population, 0)) * 1000 as rides_per_1000,
+    max(r.source_updated_at) as source_updated_at
+from {{ ref('mart_station_hourly_rollup') }} r
+{% if is_incremental() %}
+join {{ touched_days(ref('mart_station_hourly_rollup'), 'date', 'source_updated_at') }} d
+  on r.date = d.day
+{% endif %}
 left join {{ ref('population') }} p
-  on m.location = p.location
- and extract(year from m.start_time) = p.year
+  on r.location = p.location
+ and extract(year from r.date) = p.year
+where r.location = 'nyc'
 group by 1, 2, 3, 4, 10
-order by 2 
\ No newline at end of file
+-- Days that only have trips ending on them (started the day before)
+having sum(r.ride_count) > 0
@@ -4,8 +4,10 @@
 
 select
     location,
-    date_trunc('month', start_time) as month,
-    count(*) filter (where user_type = 'member') * 100.0 / count(*) as member_percentage
-from {{ ref('int_nyc_rides') }}
+    date_trunc('month', date) as month,
+    sum(member_rides) * 100.0 / sum(ride_count) as member_percentage
+from {{ ref('mart_station_hourly_rollup') }}
+where location = 'nyc'
 group by 1, 2
-order by 2 
\ No newline at end of file
+having sum(ride_count) > 0
+order by 2
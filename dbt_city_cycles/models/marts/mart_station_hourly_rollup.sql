@@ -0,0 +1,105 @@
+{{ config(
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key=['location', 'date'],
+    indexes=[
+        {'columns': ['location', 'date']},
+        {'columns': ['location', 'station_id', 'date']},
+        {'columns': ['source_updated_at']}
+    ]
+) }}
+
+-- One row per (location, station_id, date, hour_of_day): rides started there
+-- (count, duration, member/casual split) and trips ended there. Marts and
+-- the dashboard aggregate from this instead of scanning int_*_rides.
+--
+-- Incremental runs recompute whole days: those with newly loaded rides
+-- starting or ending on them (see the touched_days macro). Rides ending on a
+-- day are looked up among rides started up to rollup_max_ride_days earlier,
+-- so the int tables' start_time partitions can be pruned. Full builds apply
+-- the same window (which also drops trips starting after the day they end),
+-- so trip_end_count does not depend on how a day was built.
+
+{% set cities = [
+    {'name': 'nyc', 'rides': ref('int_nyc_rides'), 'user_type': true},
+    {'name': 'london', 'rides': ref('int_london_rides'), 'user_type': false}
+] %}
+
+with
+{% for city in cities %}
+{% if is_incremental() %}
+{{ city.name }}_days as (
+    select day from {{ touched_days(city.rides, 'start_time') }} starts
+    union
+    select day from {{ touched_days(city.rides, 'stop_time') }} ends
+),
+{% endif %}
+
+{{ city.name }}_events as (
+    select
+        m.location,
+        m.start_station_id as station_id,
+        m.start_station_name as station_name,
+        m.start_time as event_time,
+        true as is_start,
+        m.duration_seconds,
+        {% if city.user_type %}m.user_type{% else %}null::text{% endif %} as user_type,
+        m.dbt_updated_at
+    from {{ city.rides }} m
+    {% if is_incremental() %}
+    join {{ city.name }}_days d
+      on m.start_time >= d.day and m.start_time < d.day + interval '1 day'
+    {% else %}
+    where m.start_time is not null
+    {% endif %}
+    union all
+    select
+        m.location,
+        m.end_station_id,
+        m.end_station_name,
+        m.stop_time,
+        false,
+        null,
+        null,
+        m.dbt_updated_at
+    from {{ city.rides }} m
+    {% if is_incremental() %}
+    join {{ city.name }}_days d
+      on m.stop_time >= d.day and m.stop_time < d.day + interval '1 day'
+     and m.start_time >= d.day - interval '{{ var("rollup_max_ride_days", 7) }} days'
+     and m.start_time < d.day + interval '1 day'
+    {% else %}
+    where m.stop_time is not null
+      and m.start_time >= date_trunc('day', m.stop_time) - interval '{{ var("rollup_max_ride_days", 7) }} days'
+      and m.start_time < date_trunc('day', m.stop_time) + interval '1 day'
+    {% endif %}
+),
+
+{{ city.name }}_rollup as (
+    select
+        location,
+        station_id,
+        max(station_name) as station_name,
+        date_trunc('day', event_time) as date,
+        extract(hour from event_time)::int as hour_of_day,
+        count(*) filter (where is_start) as ride_count,
+        sum(duration_seconds) filter (where is_start) as duration_seconds_sum,
+        count(duration_seconds) filter (where is_start) as duration_count,
+        {% if city.user_type -%}
+        count(*) filter (where is_start and user_type = 'member') as member_rides,
+        count(*) filter (where is_start and user_type = 'casual') as casual_rides,
+        {%- else -%}
+        null::bigint as member_rides,
+        null::bigint as casual_rides,
+        {%- endif %}
+        count(*) filter (where not is_start) as trip_end_count,
+        max(dbt_updated_at) as source_updated_at
+    from {{ city.name }}_events
+    group by location, station_id, date_trunc('day', event_time), extract(hour from event_time)::int
+){% if not loop.last %},{% endif %}
+{% endfor %}
+
+{% for city in cities %}
+select * from {{ city.name }}_rollup
+{% if not loop.last %}union all{% endif %}
+{% endfor %}
@@ -1,18 +1,18 @@
 {{ config(
     materialized='incremental',
+    on_schema_change='append_new_columns',
     unique_key='ride_id',
     indexes=[
         {'columns': ['start_time']},
         {'columns': ['ride_id'], 'unique': true},
-        {'columns': ['bike_id']}
+        {'columns': ['bike_id']},
+        {'columns': ['load_batch_id']}
     ]
 ) }}
 
 with source as (
     select * from {{ source('raw', 'raw_london_modern') }}
-    {% if is_incremental() %}
-    where source_file not in (select distinct source_file from {{ this }})
-    {% endif %}
+    where {{ load_batch_filter() }}
 ),
 
 renamed as (
@@ -21,16 +21,17 @@ renamed as (
         number as ride_id,
         bike_number as bike_id,
         bike_model,
-        start_date::timestamp as start_time,
-        end_date::timestamp as stop_time,
+        start_date as start_time,
+        end_date as stop_time,
         start_station as start_station_name,
         start_station_number as start_station_id,
         end_station as end_station_name,
         end_station_number as end_station_id,
-        -- Calculate duration in seconds from timestamps
-        extract(epoch from (end_date::timestamp - start_date::timestamp)) as duration_seconds,
+        -- Calculate duration in seconds from timestamps (raw columns are TIMESTAMP)
+        extract(epoch from (end_date - start_date)) as duration_seconds,
         -- Add metadata
         source_file,
+        load_batch_id,
         'london' as location,
         'modern' as schema_version,
         current_timestamp as dbt_updated_at
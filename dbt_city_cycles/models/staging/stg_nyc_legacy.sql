@@ -1,19 +1,19 @@
 {{ config(
     materialized='incremental',
+    on_schema_change='append_new_columns',
     unique_key=['bikeid', 'starttime', 'stoptime', 'start_station_id'],
     indexes=[
         {'columns': ['start_time']},
         {'columns': ['ride_id'], 'unique': true},
         {'columns': ['bike_id']},
-        {'columns': ['user_type']}
+        {'columns': ['user_type']},
+        {'columns': ['load_batch_id']}
     ]
 ) }}
 
 with source as (
     select * from {{ source('raw', 'raw_nyc_legacy') }}
-    {% if is_incremental() %}
-    where source_file not in (select distinct source_file from {{ this }})
-    {% endif %}
+    where {{ load_batch_filter() }}
 ),
 
 renamed as (
@@ -46,6 +46,7 @@ renamed as (
         gender::integer,
         -- Add metadata
         source_file,
+        load_batch_id,
         'nyc' as location,
         'legacy' as schema_version,
         current_timestamp as dbt_updated_at
@@ -1,17 +1,32 @@
 {{ config(
-    materialized='table',
-    indexes=[
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key='ride_id',
+    on_schema_change='append_new_columns',
+    managed_indexes=[
         {'columns': ['start_time']},
         {'columns': ['ride_id'], 'unique': true},
-        {'columns': ['bike_id']},
-        {'columns': ['user_type']}
-    ]
+        {'columns': ['user_type']},
+        {'columns': ['load_batch_id']}
+    ],
+    post_hook="{{ create_missing_indexes() }}"
 ) }}
 
 with source as (
     select * from {{ source('raw', 'raw_nyc_modern') }}
+    where {{ load_batch_filter() }}
 ),
 
+{% if is_incremental() %}
+-- A ride_id repeated within the new batches keeps its latest copy, so the
+-- merge into the unique ride_id index sees each key once
+deduplicated as (
+    select distinct on (ride_id) *
+    from source
+    order by ride_id, load_batch_id desc
+),
+{% endif %}
+
 renamed as (
     select
         -- Standardize column names with proper types
@@ -32,10 +47,11 @@ renamed as (
         extract(epoch from (ended_at::timestamp - started_at::timestamp)) as duration_seconds,
         -- Add metadata
         source_file,
+        load_batch_id,
         'nyc' as location,
         'modern' as schema_version,
         current_timestamp as dbt_updated_at
-    from source
+    from {% if is_incremental() %}deduplicated{% else %}source{% endif %}
 )
 
-select * from renamed 
\ No newline at end of file
+select * from renamed
@@ -0,0 +1,21 @@
+import pandas as pd
+from data_models import chunking
+from data_models.chunking import ChunkSizer, parse_size
+
+
+def test_parse_size():
+    assert parse_size("8G") == 8 * 1024 ** 3
+    assert parse_size("512M") == 512 * 1024 ** 2
+    assert parse_size("1.5GB") == int(1.5 * 1024 ** 3)
+    assert parse_size("1048576") == 1048576
+
+
+def test_chunk_sizer_grows_gradually_and_shrinks_on_bloat(monkeypatch):
+    monkeypatch.setattr(chunking, "_rss", lambda: 100 * 1024 ** 2)
+    sizer = ChunkSizer(256 * 1024 ** 2, initial_rows=1000, remeasure_every=1)
+    narrow = pd.DataFrame({"station": ["a" * 10] * 1000})
+    # Growth is capped at 2x per chunk
+    assert [sizer.observe(narrow) for _ in range(3)] == [2000, 4000, 8000]
+    # Much wider rows (long station names) shrink the next chunk at once
+    wide = pd.DataFrame({"station": ["b" * 20000] * 100})
+    assert sizer.observe(wide) < 8000
@@ -0,0 +1,17 @@
+import pandas as pd
+from data_models.nyc_bike import NYCModernBikeShareRecord
+
+
+def test_csv_dtypes_declare_compact_columns():
+    dtypes = NYCModernBikeShareRecord.get_csv_dtypes()
+    assert dtypes["start_station_name"] == "category"
+    assert dtypes["member_casual"] == "category"
+    assert dtypes["start_lat"] == "float32"
+    assert dtypes["ride_id"] == "str"
+
+
+def test_source_file_is_broadcast_as_one_category():
+    column = NYCModernBikeShareRecord.constant_column("202312-citibike-tripdata_3.csv", pd.RangeIndex(1000))
+    assert column.dtype == "category"
+    assert list(column.cat.categories) == ["202312-citibike-tripdata_3.csv"]
+    assert column.memory_usage(deep=True) < 2000
@@ -0,0 +1,15 @@
+from benchmarks.import_bench import measure, parse_importtime
+
+
+def test_parse_importtime():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |   data_models.settings",
+        "import time:       300 |        420 | data_models",
+    ])
+    assert parse_importtime(stderr) == [("data_models.settings", 120, 120, 1), ("data_models", 300, 420, 0)]
+
+
+def test_models_import_without_heavy_dependencies():
+    result = measure("data_models")
+    assert result["deferred_loaded"] == []
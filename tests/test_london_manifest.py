@@ -0,0 +1,31 @@
+from data_ingestion.london_manifest import LondonManifest
+
+
+def _manifest(tmp_path):
+    manifest = LondonManifest(str(tmp_path / "manifest.json"))
+    files = [("https://host/a/1JourneyDataExtract2023.csv", "a/1JourneyDataExtract2023.csv"),
+             ("https://host/a/2JourneyDataExtract2023.csv", "a/2JourneyDataExtract2023.csv")]
+    manifest.update_listing(files, lambda href: "london_csv/" + href.split("/")[-1])
+    return manifest
+
+
+def test_pending_diffs_against_bucket_and_adopts_existing(tmp_path):
+    manifest = _manifest(tmp_path)
+    manifest.update_metadata("a/1JourneyDataExtract2023.csv", {"size": 10, "etag": "e1"})
+    pending = manifest.pending({"london_csv/1JourneyDataExtract2023.csv": 10})
+    assert pending == [("https://host/a/2JourneyDataExtract2023.csv", "a/2JourneyDataExtract2023.csv")]
+    assert manifest.files["a/1JourneyDataExtract2023.csv"]["uploaded_etag"] == "e1"
+
+
+def test_republished_file_is_pending_and_manifest_round_trips(tmp_path):
+    manifest = _manifest(tmp_path)
+    href = "a/1JourneyDataExtract2023.csv"
+    manifest.update_metadata(href, {"size": 10, "etag": "e1"})
+    manifest.mark_uploaded("london_csv/1JourneyDataExtract2023.csv")
+    manifest.update_metadata(href, {"size": 12, "etag": "e2"})
+    bucket = {"london_csv/1JourneyDataExtract2023.csv": 10, "london_csv/2JourneyDataExtract2023.csv": 5}
+    assert [h for _, h in manifest.pending(bucket)] == [href]
+    manifest.save()
+    reloaded = LondonManifest(manifest.path)
+    assert reloaded.is_fresh(3600)
+    assert reloaded.files[href]["uploaded_etag"] == "e1"
@@ -0,0 +1,34 @@
+from data_models.base import BaseBikeShareRecord
+from data_models.london_bike import LondonLegacyBikeShareRecord, LondonModernBikeShareRecord
+from data_models.nyc_bike import NYCModernBikeShareRecord, NYCLegacyBikeShareRecord
+
+
+def test_route_header_by_signature():
+    assert BaseBikeShareRecord.route_header(NYCLegacyBikeShareRecord.required_columns, "nyc_csv/") is NYCLegacyBikeShareRecord
+    assert BaseBikeShareRecord.route_header(NYCModernBikeShareRecord.required_columns, "nyc_csv/") is NYCModernBikeShareRecord
+    assert BaseBikeShareRecord.route_header(LondonLegacyBikeShareRecord.required_columns, "london_csv/") is LondonLegacyBikeShareRecord
+    assert BaseBikeShareRecord.route_header(LondonModernBikeShareRecord.required_columns, "london_csv/") is LondonModernBikeShareRecord
+
+
+def test_route_header_normalizes_and_respects_prefix():
+    header = ['\ufeff"ride_id"'] + [f' {col} ' for col in NYCModernBikeShareRecord.required_columns[1:]]
+    assert BaseBikeShareRecord.route_header(header, "nyc_csv/") is NYCModernBikeShareRecord
+    assert BaseBikeShareRecord.route_header(header, "london_csv/") is None
+
+
+def test_route_header_missing_columns():
+    header = NYCModernBikeShareRecord.required_columns[:-1]
+    assert BaseBikeShareRecord.route_header(header, "nyc_csv/") is None
+    assert NYCModernBikeShareRecord.missing_columns(header) == ["member_casual"]
+
+
+def test_first_line_of_empty_object():
+    import pytest
+    exceptions = pytest.importorskip("botocore.exceptions")
+    from data_models.s3_stream import read_s3_first_line
+
+    class EmptyObjectClient:
+        def get_object(self, **kwargs):
+            raise exceptions.ClientError({"Error": {"Code": "InvalidRange"}}, "GetObject")
+
+    assert read_s3_first_line(EmptyObjectClient(), "bucket", "nyc_csv/empty.csv") == ""
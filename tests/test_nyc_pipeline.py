@@ -0,0 +1,62 @@
+import io
+import os
+import shutil
+import zipfile
+import pytest
+
+pytest.importorskip("boto3")
+from data_ingestion.pipeline import DiskBudget, TransferPipeline
+
+
+class FakeS3:
+    """In-memory stand-in exposing the two transfer calls the pipeline uses."""
+
+    def __init__(self, objects=None):
+        self.objects = dict(objects or {})
+
+    def download_file(self, bucket, key, path, Config=None):
+        with open(path, "wb") as f:
+            f.write(self.objects[(bucket, key)])
+
+    def upload_fileobj(self, fileobj, bucket, key, Config=None):
+        out = io.BytesIO()
+        shutil.copyfileobj(fileobj, out)
+        self.objects[(bucket, key)] = out.getvalue()
+
+
+def _zip_bytes(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_pipeline_uploads_flat_and_nested_members(tmp_path):
+    nested = _zip_bytes({"202301-citibike-tripdata_2.csv": b"ride_id\nB\n"})
+    archive = _zip_bytes({
+        "202301-citibike-tripdata_1.csv": b"ride_id\nA\n",
+        "inner/202301-part.zip": nested,
+        "__MACOSX/._202301-citibike-tripdata_1.csv": b"",
+    })
+    source = FakeS3({("tripdata", "202301-citibike-tripdata.zip"): archive})
+    dest = FakeS3()
+    pipeline = TransferPipeline(source, dest, "tripdata", "private", "nyc_csv", str(tmp_path),
+                                disk_budget_bytes=len(archive) * 2)
+    result = pipeline.run([{"Key": "202301-citibike-tripdata.zip", "Size": len(archive)}])
+
+    assert result["errors"] == []
+    assert sorted(result["uploaded"]) == ["nyc_csv/202301-citibike-tripdata_1.csv",
+                                          "nyc_csv/202301-citibike-tripdata_2.csv"]
+    assert dest.objects[("private", "nyc_csv/202301-citibike-tripdata_2.csv")] == b"ride_id\nB\n"
+    # Scratch files are removed and the disk budget fully released
+    assert os.listdir(tmp_path) == []
+    assert pipeline.budget.used == 0
+
+
+def test_disk_budget_admits_oversized_item_when_idle():
+    budget = DiskBudget(10)
+    budget.acquire(50)
+    assert budget.used == 50
+    budget.release(50)
+    assert budget.used == 0
@@ -0,0 +1,31 @@
+import pytest
+import pandas as pd
+from data_models.parquet_lake import ParquetLake
+
+pytest.importorskip("pyarrow")
+
+
+class TripModel:
+    location = "nyc"
+    schema_version = "modern"
+    start_time_field = "started_at"
+
+
+def _chunks():
+    starts = ["2023-01-31 23:59:00", "2023-02-01 00:01:00", "2023-02-01 00:02:00",
+              "2023-02-02 08:00:00", "2023-02-03 09:00:00"]
+    for i, start in enumerate(starts):
+        yield pd.DataFrame({"ride_id": [str(i)], "started_at": [start]})
+
+
+def test_forced_reconversion_replaces_the_sources_parts(tmp_path):
+    lake = ParquetLake(root=str(tmp_path), part_rows=2)
+    assert lake.write_chunks(TripModel, "202302-citibike-tripdata.csv", _chunks()) == 5
+    assert len(lake.manifest["parts"]) == 3
+
+    # Bigger parts give fewer, differently numbered files on the second run
+    lake = ParquetLake(root=str(tmp_path))
+    lake.write_chunks(TripModel, "202302-citibike-tripdata.csv", _chunks())
+    assert len(lake.manifest["parts"]) == 2
+    assert sum(part["rows"] for part in lake.manifest["parts"]) == 5
+    assert lake.dataset().count_rows() == 5
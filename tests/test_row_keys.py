@@ -0,0 +1,26 @@
+import pandas as pd
+from data_models.dedup import RowKeyIndex
+from data_models.nyc_bike import NYCLegacyBikeShareRecord
+
+
+def test_row_hashes_use_the_natural_key_and_ignore_encoding():
+    df = pd.DataFrame({
+        "bikeid": ["1", "1", "2"],
+        "starttime": ["2019-06-01 00:00:01.0000"] * 3,
+        "stoptime": ["2019-06-01 00:10:01.0000"] * 3,
+        "start_station_id": ["72", "72", "72"],
+        "usertype": ["Subscriber", "Customer", "Subscriber"],
+    })
+    hashes = RowKeyIndex.row_hashes(NYCLegacyBikeShareRecord, df)
+    # usertype is not part of the key
+    assert hashes[0] == hashes[1] != hashes[2]
+    categorical = df.astype({"start_station_id": "category"})
+    assert (RowKeyIndex.row_hashes(NYCLegacyBikeShareRecord, categorical) == hashes).all()
+
+
+def test_row_hashes_treat_nan_and_sql_null_alike():
+    columns = NYCLegacyBikeShareRecord.row_key_columns
+    loaded = pd.DataFrame([["1", "2019-06-01 00:00:01", "2019-06-01 00:10:01", float("nan")]], columns=columns)
+    backfilled = pd.DataFrame([["1", "2019-06-01 00:00:01", "2019-06-01 00:10:01", None]], columns=columns)
+    assert RowKeyIndex.row_hashes(NYCLegacyBikeShareRecord, loaded)[0] == \
+        RowKeyIndex.row_hashes(NYCLegacyBikeShareRecord, backfilled)[0]
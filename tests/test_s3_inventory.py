@@ -0,0 +1,63 @@
+from data_models.inventory import S3Inventory, parse_year_month
+
+
+class FakePaginator:
+    def __init__(self, client):
+        self.client = client
+
+    def paginate(self, Bucket, Prefix=""):
+        self.client.calls.append(Prefix)
+        keys = sorted(k for k in self.client.keys if k.startswith(Prefix))
+        yield {"Contents": [{"Key": k, "Size": 1, "ETag": f'"{self.client.etags.get(k, "etag")}"'} for k in keys]}
+
+
+class FakeClient:
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self.etags = {}
+        self.calls = []
+
+    def get_paginator(self, name):
+        return FakePaginator(self)
+
+
+def test_parse_year_month():
+    assert parse_year_month("nyc_csv/202302-citibike-tripdata_1.csv") == (2023, 2)
+    assert parse_year_month("2019-citibike-tripdata.zip") == (2019, None)
+    assert parse_year_month("london_csv/390JourneyDataExtract04Jan2024-10Jan2024.csv") == (2024, 1)
+    assert parse_year_month("london_csv/01aJourneyDataExtract10Jan16-23Jan16.csv") == (2016, 1)
+    # A year elsewhere in the name is not the file's year
+    assert parse_year_month("london_csv/notes_2019.csv") == (None, None)
+
+
+def test_refresh_caches_per_process_and_filters_on_parsed_year(tmp_path):
+    client = FakeClient(["nyc_csv/201912-citibike-tripdata.csv", "nyc_csv/202001-citibike-tripdata_2019.csv"])
+    inventory = S3Inventory(str(tmp_path / "inv.sqlite"))
+    inventory.refresh(client, "bucket", "nyc_csv/")
+    assert inventory.keys("bucket", "nyc_csv/", year=2019) == ["nyc_csv/201912-citibike-tripdata.csv"]
+
+    # Listed at most once per process unless forced
+    inventory.refresh(client, "bucket", "nyc_csv/")
+    assert len(client.calls) == 1
+
+    client.keys.append("nyc_csv/202002-citibike-tripdata.csv")
+    reopened = S3Inventory(inventory.path)
+    assert reopened.refresh(client, "bucket", "nyc_csv/") == 1
+    assert reopened.keys("bucket", "nyc_csv/", year=2020) == [
+        "nyc_csv/202001-citibike-tripdata_2019.csv", "nyc_csv/202002-citibike-tripdata.csv"]
+    assert reopened.objects("bucket", "nyc_csv/")[0]["etag"] == "etag"
+
+
+def test_refresh_sees_keys_sorting_before_cached_ones_and_replaced_objects(tmp_path):
+    client = FakeClient(["202512-citibike-tripdata.zip", "JC-202512-citibike-tripdata.csv.zip", "index.html"])
+    inventory = S3Inventory(str(tmp_path / "inv.sqlite"))
+    inventory.refresh(client, "bucket")
+
+    # A new archive sorts before JC-... and index.html, the cached maximum
+    client.keys.append("202601-citibike-tripdata.zip")
+    client.etags["index.html"] = "new"
+    client.keys.remove("JC-202512-citibike-tripdata.csv.zip")
+    assert inventory.refresh(client, "bucket", force=True) == 2
+    assert inventory.keys("bucket", year=2026) == ["202601-citibike-tripdata.zip"]
+    assert inventory.objects("bucket")[-1]["etag"] == "new"
+    assert "JC-202512-citibike-tripdata.csv.zip" not in inventory.keys("bucket")
@@ -0,0 +1,25 @@
+import os
+import sys
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# boto3 and dotenv are replaced by stand-ins so the check runs without them
+FRESH_PROCESS = """
+import sys, types
+boto3 = types.ModuleType("boto3")
+boto3.client = lambda name: object()
+dotenv = types.ModuleType("dotenv")
+dotenv.load_dotenv = lambda: None
+sys.modules.update(boto3=boto3, dotenv=dotenv)
+
+from data_models import settings
+assert settings._settings is None
+client = settings.get_s3_client()
+assert settings.get_s3_client() is client
+assert settings._settings is not None
+"""
+
+
+def test_s3_client_before_settings_does_not_deadlock():
+    subprocess.run([sys.executable, "-c", FRESH_PROCESS], cwd=REPO_ROOT, check=True, timeout=10)